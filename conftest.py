@@ -0,0 +1,24 @@
+import json
+import pytest
+
+
+@pytest.fixture(scope="session")
+def sample_content_resources():
+    """Minimal content_resources.json data shared by the JSON tests (treat as read-only)."""
+    return {
+        "content_resources": [
+            {
+                "content_creator": "Test Creator",
+                "native_lang": "en",
+                "content_collection": []
+            }
+        ]
+    }
+
+
+@pytest.fixture(scope="session")
+def sample_content_resources_file(tmp_path_factory, sample_content_resources):
+    """Path to a JSON file holding sample_content_resources, written once per session."""
+    path = tmp_path_factory.mktemp("data") / "content_resources.json"
+    path.write_text(json.dumps(sample_content_resources), encoding='utf-8')
+    return str(path)
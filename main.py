@@ -1,16 +1,53 @@
 import json
 import os
 import re
+import shutil
 import argparse
 import requests
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import chain
+from operator import attrgetter
+from pathlib import Path
 from urllib.parse import urlparse, parse_qs
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from youtube_transcript_api import YouTubeTranscriptApi
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # Optional speedup (pip install orjson); falls back to stdlib json
+    orjson = None
+
 # Load environment variables from .env file
 load_dotenv()
 
+# Append-only log of per-video status changes made during a batch run. It is
+# folded into content_resources.json when the run ends, or on the next run if
+# the previous one was killed before it could save.
+DOWNLOAD_LOG_FILE = "downloads.log.jsonl"
+
+# str.translate table for creator names: spaces become underscores and
+# invalid filename characters (Windows + Unix) are deleted, in one pass
+_CREATOR_NAME_TABLE = str.maketrans(
+    {c: None for c in '<>:"/\\|?*'} | {chr(i): None for i in range(0x20)} | {' ': '_'}
+)
+# Filename sanitization patterns, compiled once at import time
+# Whitespace and CJK/Unicode punctuation that acts as a word boundary in titles
+_TITLE_SEPARATORS_RE = re.compile(r'[\s，。、；…·—！？：（）【】『』「」“”‘’《》〈〉～｜]+')
+# Invalid filename characters in titles (ASCII + full-width variants)
+_INVALID_TITLE_CHARS_RE = re.compile(r'[<>:"/\\|?*\x00-\x1f＜＞：＂／＼｜？＊！]')
+_REPEATED_DASHES_RE = re.compile(r'-+')
+
+# Fields of a fetched transcript snippet, read in one C-level call
+_snippet_fields = attrgetter('text', 'start', 'duration')
+
+# Per-thread YouTubeTranscriptApi instances (see _get_api)
+_thread_local = threading.local()
+
 
 def extract_video_id(value):
     """Extract a YouTube video ID from a URL or return the value as-is.
@@ -41,23 +78,59 @@ def extract_video_id(value):
     return value
 
 
+def positive_int(value):
+    """argparse type for options that must be a positive integer."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Not an integer: {value}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"Must be at least 1: {value}")
+    return number
+
+
 def load_content_resources(file_path="content_resources.json"):
     """Load content resources from JSON file."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    # Read the whole file in one call; both parsers accept UTF-8 bytes.
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 
 def save_content_resources(data, file_path="content_resources.json"):
-    """Save content resources to JSON file."""
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    """Save content resources to JSON file.
+
+    Uses orjson when available; both backends write UTF-8 with 2-space indents.
+    The payload is encoded up front and written with a single call, so an
+    encoding error never leaves a truncated file behind.
+    """
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    with open(file_path, 'wb') as f:
+        f.write(payload)
 
 
+@lru_cache(maxsize=4096)
 def format_date(published_time):
     """Convert MM-DD-YYYY to MMDDYYYY format (US style)."""
+    # The input has a fixed NN-NN-NNNN shape, so slice it instead of going
+    # through strptime/strftime; date() still rejects impossible dates such as 02-30
+    digits = published_time[0:2] + published_time[3:5] + published_time[6:10]
+    if (len(published_time) == 10 and published_time[2] == '-' and published_time[5] == '-'
+            and digits.isascii() and digits.isdigit()):
+        try:
+            date(int(digits[4:]), int(digits[:2]), int(digits[2:4]))
+            return digits
+        except ValueError:
+            pass
+    # Anything else (e.g. an unpadded 1-5-2025) goes through strptime, which
+    # accepts the same inputs as before or raises
     try:
-        date_obj = datetime.strptime(published_time, "%m-%d-%Y")
-        return date_obj.strftime("%m%d%Y")
+        return datetime.strptime(published_time, "%m-%d-%Y").strftime("%m%d%Y")
     except ValueError as e:
         raise ValueError(f"Invalid date format '{published_time}': expected MM-DD-YYYY") from e
 
@@ -73,14 +146,11 @@ def sanitize_title(title, max_length=None):
     if len(t) > 30:
         t = t[:30]
     # Convert whitespace and CJK/Unicode word-boundary punctuation to dashes.
-    t = re.sub(
-        r'[\s，。、；…·—！？：（）【】『』「」“”‘’《》〈〉～｜]+',
-        '-', t,
-    )
+    t = _TITLE_SEPARATORS_RE.sub('-', t)
     # Strip remaining invalid filename characters (ASCII + full-width variants).
-    t = re.sub(r'[<>:"/\\|?*\x00-\x1f＜＞：＂／＼｜？＊！]', '', t)
+    t = _INVALID_TITLE_CHARS_RE.sub('', t)
     # Normalize dashes.
-    t = re.sub(r'-+', '-', t)
+    t = _REPEATED_DASHES_RE.sub('-', t)
     t = t.strip('-')
     if max_length and len(t) > max_length:
         t = t[:max_length].rstrip('-')
@@ -95,74 +165,107 @@ def fetch_video_metadata(video_id):
         or None if nothing could be retrieved.
     """
     result = {}
+    # Both requests go to www.youtube.com; one session lets the page fetch
+    # reuse the oEmbed request's connection instead of a second TLS handshake.
+    # This lookup is best effort, so it uses a plain session without retries
+    # to keep the worst case at the two request timeouts.
+    with requests.Session() as session:
+        try:
+            resp = session.get(
+                "https://www.youtube.com/oembed",
+                params={"url": f"https://www.youtube.com/watch?v={video_id}", "format": "json"},
+                timeout=10,
+            )
+            if resp.status_code == 200:
+                title = resp.json().get("title")
+                if title:
+                    result["title"] = title
+        except Exception:
+            pass
 
-    try:
-        resp = requests.get(
-            "https://www.youtube.com/oembed",
-            params={"url": f"https://www.youtube.com/watch?v={video_id}", "format": "json"},
-            timeout=10,
-        )
-        if resp.status_code == 200:
-            title = resp.json().get("title")
-            if title:
-                result["title"] = title
-    except Exception:
-        pass
-
-    try:
-        page = requests.get(
-            f"https://www.youtube.com/watch?v={video_id}",
-            headers={
-                "User-Agent": (
-                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/120.0.0.0 Safari/537.36"
-                ),
-                "Accept-Language": "en-US,en;q=0.9",
-            },
-            timeout=15,
-        )
-        if page.status_code == 200:
-            # YouTube embeds dates as ISO 8601 ("2025-12-19" or "2025-12-19T00:00:00+00:00").
-            # Don't require a closing quote so the timestamp suffix doesn't break the match.
-            m = re.search(
-                r'"(?:publishDate|datePublished|uploadDate)"\s*:\s*"(\d{4}-\d{2}-\d{2})',
-                page.text,
+        try:
+            page = session.get(
+                f"https://www.youtube.com/watch?v={video_id}",
+                headers={
+                    "User-Agent": (
+                        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+                        "AppleWebKit/537.36 (KHTML, like Gecko) "
+                        "Chrome/120.0.0.0 Safari/537.36"
+                    ),
+                    "Accept-Language": "en-US,en;q=0.9",
+                },
+                timeout=15,
             )
-            if m:
-                y, mo, d = m.group(1).split("-")
-                result["upload_date"] = f"{mo}-{d}-{y}"
-    except Exception:
-        pass
+            if page.status_code == 200:
+                # YouTube embeds dates as ISO 8601 ("2025-12-19" or "2025-12-19T00:00:00+00:00").
+                # Don't require a closing quote so the timestamp suffix doesn't break the match.
+                m = re.search(
+                    r'"(?:publishDate|datePublished|uploadDate)"\s*:\s*"(\d{4}-\d{2}-\d{2})',
+                    page.text,
+                )
+                if m:
+                    y, mo, d = m.group(1).split("-")
+                    result["upload_date"] = f"{mo}-{d}-{y}"
+        except Exception:
+            pass
 
     return result if result else None
 
 
+@lru_cache(maxsize=4096)
 def sanitize_creator_name(creator_name):
     """Replace spaces and remove invalid filename characters."""
-    # First, strip leading/trailing spaces and periods
-    name = creator_name.strip('. ')
-    # Replace internal spaces with underscores
-    name = name.replace(" ", "_")
-    # Remove invalid filename characters (Windows + Unix)
-    name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', '', name)
-    # Final cleanup: remove any remaining leading/trailing periods or underscores
-    name = name.strip('._')
+    # Replace spaces and drop invalid characters in a single pass, then trim
+    # leading/trailing periods and underscores (including converted spaces)
+    name = creator_name.translate(_CREATOR_NAME_TABLE).strip('._')
     return name if name else "Unknown"
 
 
 def generate_filename(published_time, video_id, video_title=None):
     """Generate filename: MMDDYYYY_VideoID[_Video-Title].txt"""
     date_str = format_date(published_time)
+    if not video_title:
+        return f"{date_str}_{video_id}.txt"
+    # Reserve chars for the fixed parts so total stays under 200 chars.
+    max_title_len = max(10, 200 - len(date_str) - len(video_id) - len("__.txt"))
+    return f"{date_str}_{video_id}_{sanitize_title(video_title, max_length=max_title_len)}.txt"
 
-    if video_title:
-        # Reserve chars for fixed parts so total stays under 200 chars.
-        reserved = len(date_str) + 1 + len(video_id) + 1 + len(".txt")
-        max_title_len = max(10, 200 - reserved)
-        title_str = sanitize_title(video_title, max_length=max_title_len)
-        return f"{date_str}_{video_id}_{title_str}.txt"
 
-    return f"{date_str}_{video_id}.txt"
+def generate_filenames(videos):
+    """Generate filenames for a list of content collection entries.
+
+    Returns one filename per video, in order, exactly as generate_filename
+    would for that video's published_time, video_id and video_title.
+    """
+    return list(map(
+        generate_filename,
+        [video['published_time'] for video in videos],
+        [video['video_id'] for video in videos],
+        [video['video_title'] for video in videos],
+    ))
+
+
+def _new_http_session():
+    """Create a requests.Session that keeps connections alive and retries transient failures."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504)),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _get_api():
+    """Return the calling thread's YouTubeTranscriptApi, creating it on first use.
+
+    The API wraps a requests.Session and is not thread-safe, so each worker
+    thread keeps its own instance and reuses its connections across videos.
+    """
+    api = getattr(_thread_local, 'api', None)
+    if api is None:
+        api = _thread_local.api = YouTubeTranscriptApi(http_client=_new_http_session())
+    return api
 
 
 def download_transcript(video_id, output_filename, native_lang=None):
@@ -173,8 +276,7 @@ def download_transcript(video_id, output_filename, native_lang=None):
               caption_enabled is True if captions exist, False if disabled, None if unknown
     """
     try:
-        # Create API instance
-        ytt_api = YouTubeTranscriptApi()
+        ytt_api = _get_api()
 
         # Try to get transcript in native language if specified
         if native_lang:
@@ -188,22 +290,24 @@ def download_transcript(video_id, output_filename, native_lang=None):
                     if t.language_code.startswith(native_lang):
                         transcript = t
                         break
-            if transcript is not None:
-                transcript_data = transcript.fetch()
-            else:
-                transcript_data = ytt_api.fetch(video_id)
+            if transcript is None:
+                # Same default as ytt_api.fetch(), but reuses the list we already
+                # have instead of fetching it from YouTube a second time
+                transcript = transcript_list.find_transcript(['en'])
+            transcript_data = transcript.fetch()
         else:
             transcript_data = ytt_api.fetch(video_id)
 
+        # Format and encode the whole transcript up front
+        body = "".join([
+            f"[{start:.2f}s - {start + duration:.2f}s] {text}\n"
+            for text, start, duration in map(_snippet_fields, transcript_data)
+        ]).encode('utf-8')
+
         # Write transcript to file
         try:
-            with open(output_filename, 'w', encoding='utf-8') as f:
-                for entry in transcript_data:
-                    text = entry.text
-                    start_time = entry.start
-                    duration = entry.duration
-                    f.write(f"[{start_time:.2f}s - {start_time + duration:.2f}s] {text}\n")
-        except IOError as e:
+            Path(output_filename).write_bytes(body)
+        except OSError as e:
             # Transcript was successfully fetched, so captions ARE enabled
             # The failure is a local file system issue
             return False, f"Failed to write file: {str(e)}", True
@@ -277,28 +381,146 @@ def download_single_video(video_id, output_dir="transcripts", creator_name=None,
         return False
 
 
-def main():
+def _save_progress(data):
+    """Persist download status, warning instead of aborting the batch on failure.
+
+    Returns:
+        bool: True if the JSON was written
+    """
+    try:
+        save_content_resources(data)
+        return True
+    except Exception as e:
+        print(f"  ⚠️  Warning: Failed to update JSON: {e}")
+        return False
+
+
+def iter_videos(data):
+    """Yield (native_lang, video) for every video across all content creators.
+
+    Used by passes that don't care which creator a video belongs to, such as
+    replay_download_log. main() walks the creators itself so its status lines
+    are grouped under each creator's header.
+    """
+    return chain.from_iterable(
+        ((resource.get('native_lang'), video) for video in resource['content_collection'])
+        for resource in data['content_resources']
+    )
+
+
+def append_download_log(log_file, video):
+    """Append a video's download status flags to the download log as one JSON line."""
+    record = {
+        'video_id': video['video_id'],
+        'downloaded_via_native_api': video['downloaded_via_native_api'],
+    }
+    if 'caption_enabled' in video:
+        record['caption_enabled'] = video['caption_enabled']
+    log_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def replay_download_log(data, log_path=DOWNLOAD_LOG_FILE):
+    """Apply status flags recorded in the download log to the content resources.
+
+    Later records win. A truncated last line (from a killed run) is ignored.
+
+    Returns:
+        int: number of log records applied
+    """
+    if not os.path.exists(log_path):
+        return 0
+
+    updates = {}
+    with open(log_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            updates.setdefault(record.pop('video_id'), {}).update(record)
+
+    for _, video in iter_videos(data):
+        if video['video_id'] in updates:
+            video.update(updates[video['video_id']])
+
+    return len(updates)
+
+
+def process_video(video, native_lang, output_prefix, filename=None):
+    """Download the transcript for a single content collection entry.
+
+    Runs in a worker thread: it only reads from ``video`` and writes its own
+    transcript file, leaving JSON updates to the caller. ``output_prefix`` is
+    the output directory including its trailing separator, so building the
+    path is a plain concatenation. Pass ``filename`` if the caller already
+    generated it.
+
+    Returns:
+        tuple: (video, filename, success, error_message, caption_enabled)
+    """
+    video_id = video['video_id']
+    if filename is None:
+        filename = generate_filename(video['published_time'], video_id, video['video_title'])
+    output_path = output_prefix + filename
+    success, error, caption_enabled = download_transcript(video_id, output_path, native_lang)
+    return video, filename, success, error, caption_enabled
+
+
+def share_result(result, video, output_prefix):
+    """Reuse a process_video result for another entry with the same video ID.
+
+    The downloaded transcript is copied to the entry's own filename when it
+    differs (e.g. a different title or date), so no second fetch is needed.
+
+    Returns:
+        tuple: (video, filename, success, error_message, caption_enabled)
+    """
+    _, source_filename, success, error, caption_enabled = result
+    filename = generate_filename(video['published_time'], video['video_id'], video['video_title'])
+    if success and filename != source_filename:
+        try:
+            shutil.copyfile(output_prefix + source_filename, output_prefix + filename)
+        except OSError as e:
+            return video, filename, False, f"Failed to write file: {str(e)}", caption_enabled
+    return video, filename, success, error, caption_enabled
+
+
+def main(max_workers=8):
     """
     Main function to download YouTube transcripts.
 
-    Reads content_resources.json, downloads transcripts for each video,
-    and updates the JSON with download status.
+    Reads content_resources.json, downloads transcripts for each video
+    concurrently (up to max_workers at a time), and updates the JSON with
+    download status.
     """
     # Create output directory if it doesn't exist
     output_dir = "transcripts"
     os.makedirs(output_dir, exist_ok=True)
+    # Join once; per-video paths are then plain string concatenation
+    output_prefix = os.path.join(output_dir, "")
 
     # Load content resources
     print("Loading content resources...")
     data = load_content_resources()
 
+    # Recover status changes from a run that ended before saving the JSON
+    recovered = replay_download_log(data)
+    if recovered:
+        print(f"Recovered status for {recovered} videos from {DOWNLOAD_LOG_FILE}")
+
     # Statistics
     total_videos = 0
     successful_downloads = 0
     failed_downloads = 0
     already_downloaded = 0
 
-    # Process each content creator
+    # List existing transcripts once instead of stat'ing each output path
+    with os.scandir(output_dir) as entries:
+        existing_files = {entry.name for entry in entries if entry.is_file()}
+
+    # Collect pending downloads creator by creator, so each "Already
+    # downloaded" line is printed under its creator's header
+    tasks = []
     for resource in data['content_resources']:
         creator_name = resource['content_creator']
         native_lang = resource.get('native_lang')
@@ -313,49 +535,96 @@ def main():
         print(f"Videos: {len(content_collection)}")
         print(f"{'='*60}")
 
-        for video in content_collection:
-            total_videos += 1
-            video_id = video['video_id']
-            video_title = video['video_title']
-            published_time = video['published_time']
+        # Generate the collection's filenames up front in one batch
+        total_videos += len(content_collection)
+        filenames = generate_filenames(content_collection)
 
-            # Generate filename
-            filename = generate_filename(published_time, video_id, video_title)
-            output_path = os.path.join(output_dir, filename)
+        for video, filename in zip(content_collection, filenames):
+            video_title = video['video_title']
 
             # Check if already downloaded via native API
-            if video.get('downloaded_via_native_api', False) and os.path.exists(output_path):
+            if video.get('downloaded_via_native_api', False) and filename in existing_files:
                 print(f"✓ Already downloaded: {video_title}")
                 already_downloaded += 1
                 continue
 
-            # Download transcript using YouTube Transcript API
-            print(f"Downloading: {video_title}")
-            print(f"  Video ID: {video_id}")
-            print(f"  Filename: {filename}")
-
-            success, error, caption_enabled = download_transcript(video_id, output_path, native_lang)
-
-            if success:
-                print(f"  ✓ Success")
-                video['downloaded_via_native_api'] = True
-                video['caption_enabled'] = True
-                try:
-                    save_content_resources(data)
-                except Exception as e:
-                    print(f"  ⚠️  Warning: Failed to update JSON: {e}")
-                successful_downloads += 1
-            else:
-                print(f"  ✗ Failed: {error}")
-                video['downloaded_via_native_api'] = False
-                # Only set caption_enabled if we have a definitive value (not None)
-                if caption_enabled is not None:
-                    video['caption_enabled'] = caption_enabled
-                try:
-                    save_content_resources(data)
-                except Exception as e:
-                    print(f"  ⚠️  Warning: Failed to update JSON: {e}")
-                failed_downloads += 1
+            tasks.append((video, native_lang, filename))
+
+    if tasks:
+        print(f"\nDownloading {len(tasks)} transcripts ({max_workers} workers)...")
+
+    # Download transcripts using YouTube Transcript API. Status changes are
+    # appended to the download log as they happen and written to the JSON
+    # once at the end (even on Ctrl+C or errors).
+    completed = 0
+    log_file = open(DOWNLOAD_LOG_FILE, 'a', encoding='utf-8', buffering=1)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Submit each video ID once; other entries for the same video (e.g.
+            # listed under several creators) reuse that download.
+            inflight = {}
+            duplicates = {}
+            for video, native_lang, filename in tasks:
+                future = inflight.get(video['video_id'])
+                if future is None:
+                    future = executor.submit(process_video, video, native_lang, output_prefix, filename)
+                    inflight[video['video_id']] = future
+                    duplicates[future] = []
+                else:
+                    duplicates[future].append(video)
+
+            def record(future):
+                """Print and log the results for one finished download."""
+                nonlocal successful_downloads, failed_downloads, completed
+                result = future.result()
+                results = [result] + [
+                    share_result(result, video, output_prefix) for video in duplicates[future]
+                ]
+
+                for video, filename, success, error, caption_enabled in results:
+                    print(f"Downloaded: {video['video_title']}" if success else f"Failed: {video['video_title']}")
+                    print(f"  Video ID: {video['video_id']}")
+                    print(f"  Filename: {filename}")
+
+                    if success:
+                        print(f"  ✓ Success")
+                        video['downloaded_via_native_api'] = True
+                        video['caption_enabled'] = True
+                        successful_downloads += 1
+                    else:
+                        print(f"  ✗ Failed: {error}")
+                        video['downloaded_via_native_api'] = False
+                        # Only set caption_enabled if we have a definitive value (not None)
+                        if caption_enabled is not None:
+                            video['caption_enabled'] = caption_enabled
+                        failed_downloads += 1
+
+                    append_download_log(log_file, video)
+                    completed += 1
+
+            recorded = set()
+            try:
+                for future in as_completed(duplicates):
+                    # Mark it first, so an interrupt mid-record can't record it twice
+                    recorded.add(future)
+                    record(future)
+            except KeyboardInterrupt:
+                # Drop queued downloads. Ones already running cannot be
+                # cancelled, so wait for them and record their results too;
+                # otherwise their transcripts would be downloaded again next run.
+                print("\nInterrupted - saving progress...")
+                for future in duplicates:
+                    future.cancel()
+                running = [f for f in duplicates if f not in recorded and not f.cancelled()]
+                for future in wait(running).done:
+                    if future.exception() is None:
+                        record(future)
+                raise
+    finally:
+        log_file.close()
+        # The log is only needed until its updates are safely in the JSON
+        if not (completed or recovered) or _save_progress(data):
+            os.remove(DOWNLOAD_LOG_FILE)
 
     # Print summary
     print(f"\n{'='*60}")
@@ -394,6 +663,9 @@ Examples:
 
   # Download to custom directory
   python main.py --video-id dQw4w9WgXcQ --output-dir my_transcripts
+
+  # Batch mode with more concurrent downloads
+  python main.py --workers 16
         """
     )
 
@@ -428,6 +700,12 @@ Examples:
         default='transcripts',
         help='Output directory for transcripts (default: transcripts)'
     )
+    parser.add_argument(
+        '--workers',
+        type=positive_int,
+        default=8,
+        help='Number of concurrent downloads in batch mode (default: 8)'
+    )
 
     args = parser.parse_args()
 
@@ -444,4 +722,4 @@ Examples:
         exit(0 if success else 1)
     # Batch mode
     else:
-        main()
+        main(max_workers=args.workers)
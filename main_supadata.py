@@ -1,32 +1,241 @@
+import argparse
+import hashlib
 import json
+import logging
+import logging.handlers
 import os
+import queue
+import sys
 import re
+import random
 import time
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager, suppress
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import chain
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # Optional speedup (pip install orjson); falls back to stdlib json
+    orjson = None
+
 # Load environment variables from .env file
 load_dotenv()
 
+# Status output. main() logs through a queue (see queued_logging) so a single
+# thread does all the writes to stdout.
+logger = logging.getLogger("supadata")
+
+# Supadata job polling schedule in seconds: the first check happens after
+# SUPADATA_POLL_INITIAL, later waits grow exponentially up to SUPADATA_POLL_MAX
+SUPADATA_POLL_INITIAL = float(os.getenv("SUPADATA_POLL_INITIAL", "0.3"))
+SUPADATA_POLL_MAX = float(os.getenv("SUPADATA_POLL_MAX", "5"))
+SUPADATA_JOB_TIMEOUT = 90
+
+# Whitespace and CJK/Unicode punctuation that acts as a word boundary in titles
+_TITLE_SEPARATORS_RE = re.compile(r'[\s，。、；…·—！？：（）【】『』「」"《》〈〉～｜]+')
+# Invalid filename characters in titles (ASCII + full-width variants)
+_INVALID_TITLE_CHARS_RE = re.compile(r'[<>:"/\\|?*\x00-\x1f＜＞：＂／＼｜？＊！]')
+_REPEATED_DASHES_RE = re.compile(r'-+')
+
+# Digest of the last payload save_content_resources wrote, per file path
+_last_saved_digests = {}
+
+# Invalid filename characters (Windows + Unix), and a str.translate table for
+# creator names that deletes them and turns spaces into underscores in one pass
+_INVALID_FILENAME_CHARS = frozenset('<>:"/\\|?*' + ''.join(chr(i) for i in range(0x20)))
+_CREATOR_NAME_TABLE = str.maketrans(dict.fromkeys(_INVALID_FILENAME_CHARS) | {' ': '_'})
+
+
+def _make_adapter(pool_size):
+    """Create an HTTPAdapter keeping up to pool_size connections alive."""
+    return HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
+        ),
+    )
+
+
+# Default connection pool for sessions created outside a batch run (see
+# _get_session). Sharing a pool lets requests (including every job status
+# poll) reuse keep-alive connections to the Supadata API instead of a new TLS
+# handshake each time. Transient errors are retried; the final response of an
+# exhausted retry is returned rather than raised.
+_ADAPTER = _make_adapter(32)
+
+# Per-thread requests.Session instances (see _get_session)
+_thread_local = threading.local()
+
+
+def _new_session(adapter):
+    """Create a Supadata HTTP session mounted on the given connection pool."""
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    session.mount("https://", adapter)
+    return session
+
+
+def _init_worker_session(adapter):
+    """ThreadPoolExecutor initializer: give the worker a session on the run's pool."""
+    _thread_local.session = _new_session(adapter)
+
+
+def _get_session():
+    """Return the calling thread's Supadata HTTP session, creating it on first use.
+
+    A requests.Session is not thread-safe, so each thread keeps its own.
+    Batch workers get theirs from _init_worker_session; other threads
+    share the default _ADAPTER connection pool.
+    """
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = _thread_local.session = _new_session(_ADAPTER)
+    return session
+
+
+@contextmanager
+def queued_logging():
+    """Send status logs through a queue drained by one stdout-writer thread."""
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+
+    previous_level = logger.level
+    logger.addHandler(queue_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener.start()
+    try:
+        yield
+    finally:
+        # Stopping the listener drains any records still in the queue
+        listener.stop()
+        logger.removeHandler(queue_handler)
+        logger.setLevel(previous_level)
+        logger.propagate = True
+
+
+def positive_int(value):
+    """argparse type for options that must be a positive integer."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Not an integer: {value}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"Must be at least 1: {value}")
+    return number
+
 
 def load_content_resources(file_path="content_resources.json"):
     """Load content resources from JSON file."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    # Read the whole file in one call; both parsers accept UTF-8 bytes.
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 
 def save_content_resources(data, file_path="content_resources.json"):
-    """Save content resources to JSON file."""
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    """Save content resources to JSON file.
 
+    Uses orjson when available; both backends write UTF-8 with 2-space indents,
+    matching main.py. The payload goes to a temporary file first and is
+    swapped in with os.replace, so an interrupted save never leaves a
+    truncated JSON behind. Saving data identical to what this process last
+    wrote to the same (still existing) file is skipped.
+    """
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    digest = hashlib.blake2b(payload, digest_size=16).digest()
+    if _last_saved_digests.get(file_path) == digest and os.path.exists(file_path):
+        return
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, file_path)
+    _last_saved_digests[file_path] = digest
+
+
+class PersistenceManager:
+    """Batches writes of content_resources.json during a download run.
+
+    Call mark_dirty() after changing the data; a background timer then saves
+    it at most once per ``interval`` seconds. flush() saves pending changes
+    immediately. Change the data while holding ``lock`` so a background save
+    never serializes a half-updated structure.
+    """
 
+    def __init__(self, data, file_path="content_resources.json", interval=5.0):
+        self.data = data
+        self.file_path = file_path
+        self.interval = interval
+        self.lock = threading.Lock()
+        self._dirty = False
+        self._timer = None
+
+    def mark_dirty(self):
+        """Record that the data changed and schedule a save if none is pending."""
+        with self.lock:
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Save the data now if it changed since the last save.
+
+        Returns:
+            bool: False if the save failed (the data stays dirty), True otherwise
+        """
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return True
+            try:
+                save_content_resources(self.data, self.file_path)
+            except Exception as e:
+                logger.warning(f"  ⚠️  Warning: Failed to update JSON: {e}")
+                return False
+            self._dirty = False
+            return True
+
+
+@lru_cache(maxsize=65536)
 def format_date(published_time):
     """Convert MM-DD-YYYY to MMDDYYYY format (US style)."""
+    # The input has a fixed NN-NN-NNNN shape, so slice it instead of going
+    # through strptime/strftime; date() still rejects impossible dates such as 02-30
+    digits = published_time[0:2] + published_time[3:5] + published_time[6:10]
+    if (len(published_time) == 10 and published_time[2] == '-' and published_time[5] == '-'
+            and digits.isascii() and digits.isdigit()):
+        try:
+            date(int(digits[4:]), int(digits[:2]), int(digits[2:4]))
+            return digits
+        except ValueError:
+            pass
+    # Anything else (e.g. an unpadded 1-5-2025) goes through strptime, which
+    # accepts the same inputs as before or raises
     try:
-        date_obj = datetime.strptime(published_time, "%m-%d-%Y")
-        return date_obj.strftime("%m%d%Y")
+        return datetime.strptime(published_time, "%m-%d-%Y").strftime("%m%d%Y")
     except ValueError as e:
         raise ValueError(f"Invalid date format '{published_time}': expected MM-DD-YYYY") from e
 
@@ -42,44 +251,130 @@ def sanitize_title(title, max_length=None):
     if len(t) > 30:
         t = t[:30]
     # Convert whitespace and CJK/Unicode word-boundary punctuation to dashes.
-    t = re.sub(
-        r'[\s，。、；…·—！？：（）【】『』「」""''《》〈〉～｜]+',
-        '-', t,
-    )
+    t = _TITLE_SEPARATORS_RE.sub('-', t)
     # Strip remaining invalid filename characters (ASCII + full-width variants).
-    t = re.sub(r'[<>:"/\\|?*\x00-\x1f＜＞：＂／＼｜？＊！]', '', t)
+    t = _INVALID_TITLE_CHARS_RE.sub('', t)
     # Normalize dashes.
-    t = re.sub(r'-+', '-', t)
+    t = _REPEATED_DASHES_RE.sub('-', t)
     t = t.strip('-')
     if max_length and len(t) > max_length:
         t = t[:max_length].rstrip('-')
     return t if t else "Untitled"
 
 
+@lru_cache(maxsize=65536)
 def sanitize_creator_name(creator_name):
     """Replace spaces and remove invalid filename characters."""
-    # First, strip leading/trailing spaces and periods
-    name = creator_name.strip('. ')
-    # Replace internal spaces with underscores
-    name = name.replace(" ", "_")
-    # Remove invalid filename characters (Windows + Unix)
-    name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', '', name)
-    # Final cleanup: remove any remaining leading/trailing periods or underscores
-    name = name.strip('._')
+    # Most names are already clean: nothing to strip, replace or remove
+    if (creator_name
+            and creator_name[0] not in '. _'
+            and creator_name[-1] not in '. _'
+            and ' ' not in creator_name
+            and _INVALID_FILENAME_CHARS.isdisjoint(creator_name)):
+        return creator_name
+    # Otherwise replace spaces and drop invalid characters in a single pass,
+    # then trim leading/trailing periods and underscores (including converted spaces)
+    name = creator_name.translate(_CREATOR_NAME_TABLE).strip('._')
     return name if name else "Unknown"
 
 
+@lru_cache(maxsize=65536)
 def generate_filename(published_time, video_id, video_title=None):
     """Generate filename: MMDDYYYY_VideoID[_Video-Title].txt"""
     date_str = format_date(published_time)
+    if not video_title:
+        return f"{date_str}_{video_id}.txt"
+    # Reserve chars for the fixed parts so total stays under 200 chars.
+    max_title_len = max(10, 200 - len(date_str) - len(video_id) - len("__.txt"))
+    return f"{date_str}_{video_id}_{sanitize_title(video_title, max_length=max_title_len)}.txt"
+
+
+def _write_bytes(path, data):
+    """Write bytes to path with raw os calls, replacing any existing file.
+
+    Transcripts are written once and not read back, so on platforms that
+    support it the kernel is told it can drop the pages from its cache.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        view = memoryview(data)
+        # os.write may be partial; loop until everything is out
+        while view:
+            view = view[os.write(fd, view):]
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
 
-    if video_title:
-        reserved = len(date_str) + 1 + len(video_id) + 1 + len(".txt")
-        max_title_len = max(10, 200 - reserved)
-        title_str = sanitize_title(video_title, max_length=max_title_len)
-        return f"{date_str}_{video_id}_{title_str}.txt"
+def _write_transcript(path, content):
+    """Write a transcript given as plain text (str) or structured entries (list).
+
+    Returns:
+        str|None: error message, or None if the transcript was written
+    """
+    if isinstance(content, list):
+        # Structured format with timestamps: one line of text per entry,
+        # built with a single join rather than formatting each line. Entries
+        # that are not objects carry no text and are skipped.
+        texts = [entry.get('text', '') for entry in content if isinstance(entry, dict)]
+        if not texts:
+            return "No text entries in transcript content"
+        content = "\n".join(texts) + "\n"
+    elif not isinstance(content, str):
+        return f"Unexpected content type: {type(content)}"
+
+    try:
+        _write_bytes(path, content.encode('utf-8'))
+    except IOError as e:
+        return f"Failed to write file: {str(e)}"
+    return None
+
+
+def _stream_transcript_to_file(chunks, output_filename):
+    """Write a plain-text transcript to disk as its chunks arrive.
+
+    Leading and trailing whitespace is dropped, so the file matches what the
+    JSON branch of download_transcript_via_supadata saves. The chunks go to
+    a temporary file that only replaces output_filename once the whole body
+    has arrived, so a failed download never leaves a partial transcript.
+
+    Returns:
+        tuple: (success: bool, error_message: str|None)
+    """
+    tmp_path = f"{output_filename}.tmp"
+    has_content = False
+    # Whitespace after the last text seen, held back until more text follows
+    pending = b""
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                if not has_content:
+                    chunk = chunk.lstrip()
+                    if not chunk:
+                        continue
+                    has_content = True
+                text = chunk.rstrip()
+                if text:
+                    f.write(pending)
+                    f.write(text)
+                    pending = chunk[len(text):]
+                else:
+                    pending += chunk
+        if has_content:
+            os.replace(tmp_path, output_filename)
+    except requests.exceptions.RequestException as e:
+        # Checked first: requests' errors are IOError subclasses too
+        return False, f"Network error: {str(e)}"
+    except IOError as e:
+        return False, f"Failed to write file: {str(e)}"
+    finally:
+        with suppress(FileNotFoundError):
+            os.remove(tmp_path)
 
-    return f"{date_str}_{video_id}.txt"
+    if not has_content:
+        return False, "Received empty response from Supadata API"
+    return True, None
 
 
 def download_transcript_via_supadata(video_id, output_filename, native_lang=None):
@@ -96,10 +391,7 @@ def download_transcript_via_supadata(video_id, output_filename, native_lang=None
     try:
         # Build API request using full YouTube URL
         url = "https://api.supadata.ai/v1/transcript"
-        headers = {
-            "x-api-key": api_key,
-            "Content-Type": "application/json"
-        }
+        headers = {"x-api-key": api_key}
         params = {
             "url": f"https://www.youtube.com/watch?v={video_id}",
             "text": "true"
@@ -109,41 +401,56 @@ def download_transcript_via_supadata(video_id, output_filename, native_lang=None
         if native_lang:
             params["lang"] = native_lang
 
-        # Make API request
-        response = requests.get(url, headers=headers, params=params, timeout=30)
+        # Make API request. The body is streamed so plain-text transcripts can
+        # go straight to disk; every other branch reads it in full, which
+        # releases the connection back to the pool.
+        response = _get_session().get(url, headers=headers, params=params, timeout=30, stream=True)
 
         # Handle immediate response (HTTP 200)
         if response.status_code == 200:
+            if "json" in response.headers.get("Content-Type", ""):
+                body = response.text
+            else:
+                # Peek at the first non-blank chunk: the API sometimes sends
+                # JSON even with text=true, and it may label it as text
+                chunks = iter(response.iter_content(chunk_size=65536))
+                first = next((chunk.lstrip() for chunk in chunks if chunk.strip()), b"")
+                if not first.startswith(b"{"):
+                    try:
+                        return _stream_transcript_to_file(chain([first], chunks), output_filename)
+                    finally:
+                        response.close()
+                body = (first + b"".join(chunks)).decode('utf-8', errors='replace')
+
             # Try to parse as JSON first (API sometimes returns JSON even with text=true)
             try:
-                json_response = response.json()
+                json_response = json.loads(body)
                 if isinstance(json_response, dict) and "content" in json_response:
-                    # Extract content from JSON response
-                    transcript_text = json_response["content"]
+                    # Extract content from JSON response: plain text, or
+                    # structured entries that _write_transcript joins
+                    content = json_response["content"]
                     # Strip spaces only for CJK languages (Chinese, Japanese, Korean)
                     # These languages don't use spaces between words
                     lang = json_response.get("lang", "")
-                    if lang in ("zh", "ja", "ko"):
-                        transcript_text = transcript_text.replace(" ", "")
+                    if lang in ("zh", "ja", "ko") and isinstance(content, str):
+                        content = content.replace(" ", "")
                 else:
                     # Unexpected JSON format
-                    transcript_text = response.text
+                    content = body
             except (ValueError, json.JSONDecodeError):
                 # Not JSON, treat as plain text
-                transcript_text = response.text
+                content = body
 
-            # Validate response content
-            if not transcript_text or not transcript_text.strip():
-                return False, "Received empty response from Supadata API"
+            # Validate text content; the stripped text is also what gets
+            # saved, so surrounding whitespace never ends up in the file
+            if isinstance(content, str):
+                content = content.strip()
+                if not content:
+                    return False, "Received empty response from Supadata API"
 
             # Write transcript to file
-            try:
-                with open(output_filename, 'w', encoding='utf-8') as f:
-                    f.write(transcript_text)
-            except IOError as e:
-                return False, f"Failed to write file: {str(e)}"
-
-            return True, None
+            error = _write_transcript(output_filename, content)
+            return error is None, error
 
         # Handle job queued (HTTP 202)
         elif response.status_code == 202:
@@ -154,18 +461,25 @@ def download_transcript_via_supadata(video_id, output_filename, native_lang=None
                 if not job_id:
                     return False, "Received 202 but no jobId in response"
 
-                print(f"    Job queued: {job_id}. Polling for results...")
+                logger.info(f"    Job queued: {job_id}. Polling for results...")
 
-                # Poll for job completion (max 90 seconds with 3-second intervals)
-                max_attempts = 30
-                poll_interval = 3
+                # Poll for job completion with exponential backoff plus jitter,
+                # giving up SUPADATA_JOB_TIMEOUT seconds after the job was queued.
+                # The deadline is measured on the monotonic clock, so time spent
+                # in the status requests themselves counts too.
+                job_url = f"https://api.supadata.ai/v1/transcript/{job_id}"
+                delay = SUPADATA_POLL_INITIAL
+                attempt = 0
+                started = time.monotonic()
+                deadline = started + SUPADATA_JOB_TIMEOUT
 
-                for attempt in range(max_attempts):
-                    time.sleep(poll_interval)
+                while (remaining := deadline - time.monotonic()) > 0:
+                    time.sleep(min(delay, remaining))
+                    attempt += 1
+                    delay = min(delay * 1.6, SUPADATA_POLL_MAX) + random.uniform(0, 0.2)
 
                     # Check job status
-                    job_url = f"https://api.supadata.ai/v1/transcript/{job_id}"
-                    job_response = requests.get(job_url, headers=headers, timeout=30)
+                    job_response = _get_session().get(job_url, headers=headers, timeout=30)
 
                     if job_response.status_code != 200:
                         continue
@@ -173,7 +487,7 @@ def download_transcript_via_supadata(video_id, output_filename, native_lang=None
                     job_result = job_response.json()
                     status = job_result.get("status")
 
-                    print(f"    Job status: {status} (attempt {attempt + 1}/{max_attempts})")
+                    logger.info(f"    Job status: {status} (attempt {attempt}, {time.monotonic() - started:.1f}s elapsed)")
 
                     if status == "completed":
                         content = job_result.get("content")
@@ -181,141 +495,229 @@ def download_transcript_via_supadata(video_id, output_filename, native_lang=None
                             return False, "Job completed but no content in response"
 
                         # Write transcript to file
-                        try:
-                            with open(output_filename, 'w', encoding='utf-8') as f:
-                                # Handle both plain text (str) and structured data (list)
-                                if isinstance(content, str):
-                                    f.write(content)
-                                elif isinstance(content, list):
-                                    # Structured format with timestamps
-                                    for entry in content:
-                                        text = entry.get("text", "")
-                                        f.write(f"{text}\n")
-                                else:
-                                    return False, f"Unexpected content type: {type(content)}"
-                        except IOError as e:
-                            return False, f"Failed to write file: {str(e)}"
-
-                        return True, None
+                        error = _write_transcript(output_filename, content)
+                        return error is None, error
 
                     elif status == "failed":
                         return False, "Supadata job failed"
 
                     # Continue polling for "queued" or "active"
 
-                return False, "Job timed out after 90 seconds"
+                return False, f"Job timed out after {SUPADATA_JOB_TIMEOUT:g} seconds"
 
-            except Exception as e:
+            except requests.exceptions.Timeout:
+                return False, "Timed out polling job"
+            except (requests.exceptions.RequestException, ValueError) as e:
+                # ValueError covers malformed JSON in the job responses
                 return False, f"Error polling job: {str(e)}"
 
         else:
             return False, f"Supadata API error: {response.status_code} - {response.text}"
 
+    except requests.exceptions.Timeout:
+        return False, "Network error: request timed out"
     except requests.exceptions.RequestException as e:
         return False, f"Network error: {str(e)}"
-    except Exception as e:
-        return False, f"Unexpected error: {str(e)}"
 
 
-def main():
+def transcript_video_ids(filenames):
+    """Extract the video IDs from transcript filenames (MMDDYYYY_VideoID[_Title].txt).
+
+    Only standard 11-character YouTube IDs are recognised; other names are
+    ignored, so callers should fall back to comparing full filenames.
+    """
+    return {
+        name[9:20] for name in filenames
+        if len(name) >= 24 and name[8] == '_' and name[20] in '_.' and name.endswith('.txt')
+    }
+
+
+def process_video(video, native_lang, output_prefix, filename=None):
+    """Download the Supadata transcript for a single content collection entry.
+
+    Runs in a worker thread: it only reads from ``video`` and writes its own
+    transcript file, leaving JSON updates to the caller. ``output_prefix`` is
+    the output directory including its trailing separator, so building the
+    path is a plain concatenation. Pass ``filename`` if the caller already
+    generated it.
+
+    Returns:
+        tuple: (video, filename, success, error_message)
+    """
+    if filename is None:
+        filename = generate_filename(video['published_time'], video['video_id'], video['video_title'])
+    output_path = output_prefix + filename
+    success, error = download_transcript_via_supadata(video['video_id'], output_path, native_lang)
+    return video, filename, success, error
+
+
+def main(max_workers=16):
     """
     Download YouTube transcripts using Supadata API.
 
     Only processes videos where:
     - caption_enabled is False (no YouTube captions available)
     - downloaded_via_supadata is False (not yet downloaded via Supadata)
+
+    Pending videos are downloaded concurrently, up to max_workers at a time.
+    Status output goes to stdout for the duration of the call.
     """
+    with queued_logging():
+        _download_pending(max_workers)
+
+
+def _download_pending(max_workers):
+    """Body of main(); logs through the queued handler main() sets up."""
     # Create output directory if it doesn't exist
     output_dir = "transcripts"
     os.makedirs(output_dir, exist_ok=True)
+    output_prefix = os.path.join(output_dir, "")
 
     # Load content resources
-    print("Loading content resources...")
+    logger.info("Loading content resources...")
     data = load_content_resources()
 
     # Statistics
-    total_videos = 0
     successful_downloads = 0
     failed_downloads = 0
     already_downloaded = 0
     skipped_has_captions = 0
 
-    # Process each content creator
+    # List existing transcripts once instead of stat'ing each output path
+    with os.scandir(output_dir) as entries:
+        existing_files = {entry.name for entry in entries if entry.is_file()}
+    done_ids = transcript_video_ids(existing_files)
+
+    # Filter down to videos that actually need a Supadata download, so the
+    # worker threads only ever run real downloads
+    tasks = []
     for resource in data['content_resources']:
         creator_name = resource['content_creator']
         native_lang = resource.get('native_lang')
         content_collection = resource['content_collection']
 
         if not content_collection:
-            print(f"\nSkipping '{creator_name}' - no videos in collection")
+            logger.info(f"\nSkipping '{creator_name}' - no videos in collection")
             continue
 
-        print(f"\n{'='*60}")
-        print(f"Processing: {creator_name}")
-        print(f"Videos: {len(content_collection)}")
-        print(f"{'='*60}")
+        logger.info(f"\n{'='*60}")
+        logger.info(f"Processing: {creator_name}")
+        logger.info(f"Videos: {len(content_collection)}")
+        logger.info(f"{'='*60}")
+
+        # Videos with captions should use the native API; drop them up front
+        captionless = [video for video in content_collection if not video.get('caption_enabled', True)]
+        skipped_has_captions += len(content_collection) - len(captionless)
 
-        for video in content_collection:
-            video_id = video['video_id']
-            video_title = video['video_title']
-            published_time = video['published_time']
+        for video in captionless:
+            downloaded = video.get('downloaded_via_supadata', False)
 
-            # Check if video has captions enabled
-            if video.get('caption_enabled', True):
-                # Skip videos that have captions (should use native API)
-                skipped_has_captions += 1
+            # Already downloaded via Supadata: a transcript for this video ID
+            # exists, so there is no need to build its filename
+            if downloaded and video['video_id'] in done_ids:
+                logger.info(f"✓ Already downloaded: {video['video_title']}")
+                already_downloaded += 1
                 continue
 
-            # Check if already downloaded via Supadata
-            if video.get('downloaded_via_supadata', False):
-                filename = generate_filename(published_time, video_id, video_title)
-                output_path = os.path.join(output_dir, filename)
-                if os.path.exists(output_path):
-                    print(f"✓ Already downloaded: {video_title}")
-                    already_downloaded += 1
-                    continue
+            # Generate filename once; it is reused for the download below
+            filename = generate_filename(video['published_time'], video['video_id'], video['video_title'])
 
-            total_videos += 1
+            # Non-standard IDs are not in done_ids; compare the full filename
+            if downloaded and filename in existing_files:
+                logger.info(f"✓ Already downloaded: {video['video_title']}")
+                already_downloaded += 1
+                continue
 
-            # Generate filename
-            filename = generate_filename(published_time, video_id, video_title)
-            output_path = os.path.join(output_dir, filename)
+            tasks.append((video, native_lang, output_prefix, filename))
 
-            # Download transcript using Supadata
-            print(f"Downloading: {video_title}")
-            print(f"  Video ID: {video_id}")
-            print(f"  Filename: {filename}")
+    total_videos = len(tasks)
 
-            success, error = download_transcript_via_supadata(video_id, output_path, native_lang)
+    if tasks:
+        logger.info(f"\nDownloading {len(tasks)} transcripts ({max_workers} workers)...")
 
-            if success:
-                print(f"  ✓ Success")
-                video['downloaded_via_supadata'] = True
-                try:
-                    save_content_resources(data)
-                except Exception as e:
-                    print(f"  ⚠️  Warning: Failed to update JSON: {e}")
-                successful_downloads += 1
-            else:
-                print(f"  ✗ Failed: {error}")
-                video['downloaded_via_supadata'] = False
+    # Workers spend most of their time waiting on job polls; give this run a
+    # pool large enough for each one to keep its own connection
+    adapter = _make_adapter(max(32, max_workers))
+
+    # Download transcripts using Supadata. Results are handled on this thread
+    # and saved in batches by the persistence manager (and once at the end,
+    # even on Ctrl+C or errors) instead of rewriting the JSON per video.
+    persistence = PersistenceManager(data)
+    try:
+        with ThreadPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker_session, initargs=(adapter,)
+        ) as executor:
+            futures = {executor.submit(process_video, *task): task for task in tasks}
+
+            def record(future):
+                """Report one finished download and mark its status for saving."""
+                nonlocal successful_downloads, failed_downloads
                 try:
-                    save_content_resources(data)
+                    video, filename, success, error = future.result()
                 except Exception as e:
-                    print(f"  ⚠️  Warning: Failed to update JSON: {e}")
-                failed_downloads += 1
+                    # Unexpected bug in a worker: report it against its
+                    # video and keep the rest of the batch going
+                    video, _, _, filename = futures[future]
+                    success, error = False, f"Unexpected error: {e!r}"
+
+                logger.info(f"Downloaded: {video['video_title']}" if success else f"Failed: {video['video_title']}")
+                logger.info(f"  Video ID: {video['video_id']}")
+                logger.info(f"  Filename: {filename}")
+
+                if success:
+                    logger.info(f"  ✓ Success")
+                    successful_downloads += 1
+                else:
+                    logger.info(f"  ✗ Failed: {error}")
+                    failed_downloads += 1
+
+                with persistence.lock:
+                    video['downloaded_via_supadata'] = success
+                persistence.mark_dirty()
+
+            recorded = set()
+            try:
+                for future in as_completed(futures):
+                    # Mark it first, so an interrupt mid-record can't record it twice
+                    recorded.add(future)
+                    record(future)
+            except KeyboardInterrupt:
+                # Drop queued downloads. Ones already running cannot be
+                # cancelled, so wait for them and record their results too;
+                # otherwise their transcripts would be downloaded again next run.
+                logger.info("\nInterrupted - saving progress...")
+                for future in futures:
+                    future.cancel()
+                running = [f for f in futures if f not in recorded and not f.cancelled()]
+                for future in wait(running).done:
+                    record(future)
+                raise
+    finally:
+        adapter.close()
+        persistence.flush()
 
     # Print summary
-    print(f"\n{'='*60}")
-    print(f"SUMMARY (Supadata API)")
-    print(f"{'='*60}")
-    print(f"Videos without captions: {total_videos + already_downloaded}")
-    print(f"Videos with captions (skipped): {skipped_has_captions}")
-    print(f"Already downloaded (skipped): {already_downloaded}")
-    print(f"Successful downloads: {successful_downloads}")
-    print(f"Failed downloads: {failed_downloads}")
-    print(f"\nTranscripts saved to: {output_dir}/")
+    logger.info(f"\n{'='*60}")
+    logger.info(f"SUMMARY (Supadata API)")
+    logger.info(f"{'='*60}")
+    logger.info(f"Videos without captions: {total_videos + already_downloaded}")
+    logger.info(f"Videos with captions (skipped): {skipped_has_captions}")
+    logger.info(f"Already downloaded (skipped): {already_downloaded}")
+    logger.info(f"Successful downloads: {successful_downloads}")
+    logger.info(f"Failed downloads: {failed_downloads}")
+    logger.info(f"\nTranscripts saved to: {output_dir}/")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(
+        description="Download transcripts for videos without captions using the Supadata API"
+    )
+    parser.add_argument(
+        '--workers',
+        type=positive_int,
+        default=16,
+        help='Number of concurrent downloads (default: 16)'
+    )
+
+    args = parser.parse_args()
+    main(max_workers=args.workers)
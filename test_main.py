@@ -1,38 +1,47 @@
+import argparse
 import json
 import os
 import tempfile
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from unittest.mock import MagicMock, Mock, mock_open, patch
+from youtube_transcript_api import InvalidVideoId, TranscriptsDisabled, VideoUnavailable
+import main
 from main import (
     format_date,
     sanitize_creator_name,
     sanitize_title,
     generate_filename,
+    generate_filenames,
     load_content_resources,
     save_content_resources,
-    download_transcript
+    download_transcript,
+    process_video,
+    share_result,
+    append_download_log,
+    iter_videos,
+    replay_download_log,
+    positive_int,
+    fetch_video_metadata,
+    _get_api,
+    _new_http_session
 )
 
 
 class TestDateFormatting:
     """Tests for date formatting functionality."""
 
-    def test_format_date_basic(self):
-        """Test basic date conversion from MM-DD-YYYY to MMDDYYYY."""
-        assert format_date("01-08-2026") == "01082026"
-
-    def test_format_date_different_months(self):
-        """Test date formatting with different months."""
-        assert format_date("12-19-2025") == "12192025"
-        assert format_date("06-14-2025") == "06142025"
-
-    def test_format_date_single_digit_day(self):
-        """Test date formatting with single digit days."""
-        assert format_date("09-01-2025") == "09012025"
-
-    def test_format_date_leap_year(self):
-        """Test date formatting with leap year date."""
-        assert format_date("02-29-2024") == "02292024"
+    @pytest.mark.parametrize("published_time, expected", [
+        ("01-08-2026", "01082026"),  # basic
+        ("12-19-2025", "12192025"),  # different months
+        ("06-14-2025", "06142025"),
+        ("09-01-2025", "09012025"),  # single digit day
+        ("02-29-2024", "02292024"),  # leap year
+    ])
+    def test_format_date_basic(self, published_time, expected):
+        """Test date conversion from MM-DD-YYYY to MMDDYYYY."""
+        assert format_date(published_time) == expected
 
     def test_format_date_invalid_format(self):
         """Test that invalid date format raises ValueError with helpful message."""
@@ -41,15 +50,28 @@ class TestDateFormatting:
         assert "Invalid date format" in str(exc_info.value)
         assert "expected MM-DD-YYYY" in str(exc_info.value)
 
-    def test_format_date_invalid_date(self):
-        """Test that invalid date raises ValueError."""
+    @pytest.mark.parametrize("published_time", [
+        "13-01-2025",  # Invalid month
+        "02-30-2025",  # February 30th doesn't exist
+    ])
+    def test_format_date_invalid_date(self, published_time):
+        """Test that invalid and non-existent dates raise ValueError."""
         with pytest.raises(ValueError):
-            format_date("13-01-2025")  # Invalid month
+            format_date(published_time)
 
-    def test_format_date_non_existent_date(self):
-        """Test that non-existent date raises ValueError."""
-        with pytest.raises(ValueError):
-            format_date("02-30-2025")  # February 30th doesn't exist
+    def test_format_date_invalid_date_raises_every_call(self):
+        """Test that memoization never turns an invalid date into a cached result."""
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                format_date("13-01-2025")
+
+    def test_format_date_repeated_calls_hit_cache(self):
+        """Test that repeated publish dates are served from the memo cache."""
+        format_date.cache_clear()
+        for _ in range(3):
+            assert format_date("03-15-2025") == "03152025"
+        info = format_date.cache_info()
+        assert (info.hits, info.misses) == (2, 1)
 
 
 class TestCreatorNameSanitization:
@@ -71,16 +93,19 @@ class TestCreatorNameSanitization:
         """Test Chinese characters with spaces."""
         assert sanitize_creator_name("海伦子Hellen") == "海伦子Hellen"
 
-    def test_sanitize_creator_name_invalid_windows_characters(self):
+    @pytest.mark.parametrize("creator_name", [
+        "Creator:Name",
+        "Creator/Name",
+        "Creator\\Name",
+        "Creator|Name",
+        "Creator?Name",
+        "Creator*Name",
+        'Creator"Name',
+        "Creator<Name>",
+    ])
+    def test_sanitize_creator_name_invalid_windows_characters(self, creator_name):
         """Test removal of invalid Windows filename characters."""
-        assert sanitize_creator_name("Creator:Name") == "CreatorName"
-        assert sanitize_creator_name("Creator/Name") == "CreatorName"
-        assert sanitize_creator_name("Creator\\Name") == "CreatorName"
-        assert sanitize_creator_name("Creator|Name") == "CreatorName"
-        assert sanitize_creator_name("Creator?Name") == "CreatorName"
-        assert sanitize_creator_name("Creator*Name") == "CreatorName"
-        assert sanitize_creator_name('Creator"Name') == "CreatorName"
-        assert sanitize_creator_name("Creator<Name>") == "CreatorName"
+        assert sanitize_creator_name(creator_name) == "CreatorName"
 
     def test_sanitize_creator_name_leading_trailing_periods(self):
         """Test removal of leading/trailing periods and spaces."""
@@ -180,35 +205,30 @@ class TestFilenameGeneration:
         assert len(filename) <= 200
         assert not filename.endswith("-.txt")
 
+    def test_generate_filenames_matches_single_calls(self):
+        """Test that the batch helper returns one filename per video, in order."""
+        videos = [
+            {"video_id": "abc123", "video_title": "My Cool Video", "published_time": "01-08-2026"},
+            {"video_id": "inXOHNc_UUo", "video_title": "上市即巅峰 解析SpaceX的机会", "published_time": "12-19-2025"},
+        ]
+        assert generate_filenames(videos) == [
+            generate_filename(video["published_time"], video["video_id"], video["video_title"])
+            for video in videos
+        ]
+        assert generate_filenames([]) == []
+
 
 class TestJSONOperations:
     """Tests for JSON file operations."""
 
-    def test_load_content_resources(self):
+    def test_load_content_resources(self, sample_content_resources_file, sample_content_resources):
         """Test loading content resources from JSON file."""
-        # Create a temporary JSON file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as f:
-            test_data = {
-                "content_resources": [
-                    {
-                        "content_creator": "Test Creator",
-                        "native_lang": "en",
-                        "content_collection": []
-                    }
-                ]
-            }
-            json.dump(test_data, f)
-            temp_file = f.name
-
-        try:
-            data = load_content_resources(temp_file)
-            assert data == test_data
-            assert len(data['content_resources']) == 1
-            assert data['content_resources'][0]['content_creator'] == "Test Creator"
-        finally:
-            os.unlink(temp_file)
-
-    def test_save_content_resources(self):
+        data = load_content_resources(sample_content_resources_file)
+        assert data == sample_content_resources
+        assert len(data['content_resources']) == 1
+        assert data['content_resources'][0]['content_creator'] == "Test Creator"
+
+    def test_save_content_resources(self, tmp_path):
         """Test saving content resources to JSON file."""
         test_data = {
             "content_resources": [
@@ -225,22 +245,29 @@ class TestJSONOperations:
             ]
         }
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as f:
-            temp_file = f.name
+        temp_file = tmp_path / "content_resources.json"
+        save_content_resources(test_data, temp_file)
 
-        try:
-            save_content_resources(test_data, temp_file)
+        # Verify the file was saved correctly
+        loaded_data = json.loads(temp_file.read_text(encoding='utf-8'))
 
-            # Verify the file was saved correctly
-            with open(temp_file, 'r', encoding='utf-8') as f:
-                loaded_data = json.load(f)
+        assert loaded_data == test_data
+        assert loaded_data['content_resources'][0]['content_collection'][0]['downloaded'] == True
 
-            assert loaded_data == test_data
-            assert loaded_data['content_resources'][0]['content_collection'][0]['downloaded'] == True
-        finally:
-            os.unlink(temp_file)
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_save_content_resources_writes_once(self, use_orjson):
+        """Test that the whole JSON document is encoded up front and written in one call."""
+        test_data = {"content_resources": [{"content_creator": "海伦子Hellen", "content_collection": []}]}
+        backend = main.orjson if use_orjson else None
 
-    def test_save_and_load_roundtrip(self):
+        with patch('main.orjson', backend), patch('builtins.open', mock_open()) as mocked_open:
+            save_content_resources(test_data, "content_resources.json")
+
+        handle = mocked_open()
+        handle.write.assert_called_once()
+        assert json.loads(handle.write.call_args.args[0]) == test_data
+
+    def test_save_and_load_roundtrip(self, tmp_path):
         """Test saving and loading data maintains integrity."""
         test_data = {
             "content_resources": [
@@ -260,36 +287,122 @@ class TestJSONOperations:
             ]
         }
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as f:
-            temp_file = f.name
+        temp_file = tmp_path / "content_resources.json"
+        save_content_resources(test_data, temp_file)
+        loaded_data = load_content_resources(temp_file)
+        assert loaded_data == test_data
+
+    def test_save_and_load_roundtrip_without_orjson(self, tmp_path):
+        """Test that the stdlib json fallback produces the same output as orjson."""
+        test_data = {
+            "content_resources": [
+                {
+                    "content_creator": "海伦子Hellen",
+                    "native_lang": "zh",
+                    "content_collection": [{"video_id": "abc123", "downloaded": True}]
+                }
+            ]
+        }
+
+        fast_file = tmp_path / "fast.json"
+        stdlib_file = tmp_path / "stdlib.json"
+        save_content_resources(test_data, fast_file)
+        with patch('main.orjson', None):
+            save_content_resources(test_data, stdlib_file)
+            assert load_content_resources(stdlib_file) == test_data
+
+        assert stdlib_file.read_bytes() == fast_file.read_bytes()
+        assert stdlib_file.read_text(encoding='utf-8') == json.dumps(test_data, ensure_ascii=False, indent=2)
 
-        try:
-            save_content_resources(test_data, temp_file)
-            loaded_data = load_content_resources(temp_file)
-            assert loaded_data == test_data
-        finally:
-            os.unlink(temp_file)
+
+class TestIterVideos:
+    """Tests for flattening content collections."""
+
+    def test_iter_videos_flattens_in_order_with_language(self):
+        data = {
+            "content_resources": [
+                {"content_creator": "A", "native_lang": "zh", "content_collection": [{"video_id": "a1"}, {"video_id": "a2"}]},
+                {"content_creator": "B", "content_collection": []},
+                {"content_creator": "C", "content_collection": [{"video_id": "c1"}]},
+            ]
+        }
+
+        result = [(lang, video["video_id"]) for lang, video in iter_videos(data)]
+
+        assert result == [("zh", "a1"), ("zh", "a2"), (None, "c1")]
+
+
+class TestDownloadLog:
+    """Tests for the append-only download status log."""
+
+    def test_append_and_replay_download_log(self):
+        """Test that logged status flags are applied to every entry with that video ID."""
+        data = {
+            "content_resources": [
+                {"content_creator": "A", "content_collection": [{"video_id": "abc123"}, {"video_id": "def456"}]},
+                {"content_creator": "B", "content_collection": [{"video_id": "abc123"}]},
+            ]
+        }
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_path = os.path.join(temp_dir, "downloads.log.jsonl")
+            with open(log_path, 'a', encoding='utf-8') as log_file:
+                append_download_log(log_file, {"video_id": "abc123", "downloaded_via_native_api": False})
+                append_download_log(
+                    log_file,
+                    {"video_id": "abc123", "downloaded_via_native_api": True, "caption_enabled": True},
+                )
+
+            assert replay_download_log(data, log_path) == 1
+
+        expected = {"video_id": "abc123", "downloaded_via_native_api": True, "caption_enabled": True}
+        assert data["content_resources"][0]["content_collection"][0] == expected
+        assert data["content_resources"][0]["content_collection"][1] == {"video_id": "def456"}
+        assert data["content_resources"][1]["content_collection"][0] == expected
+
+    def test_replay_download_log_ignores_truncated_line(self):
+        """Test that a partial last line from a killed run is skipped."""
+        data = {"content_resources": [{"content_creator": "A", "content_collection": [{"video_id": "abc123"}]}]}
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_path = os.path.join(temp_dir, "downloads.log.jsonl")
+            with open(log_path, 'w', encoding='utf-8') as f:
+                f.write('{"video_id": "abc123", "downloaded_via_native_api": true}\n{"video_id": "abc')
+
+            assert replay_download_log(data, log_path) == 1
+
+        assert data["content_resources"][0]["content_collection"][0]["downloaded_via_native_api"] == True
+
+    def test_replay_download_log_missing_file(self):
+        """Test that a missing log is a no-op."""
+        data = {"content_resources": []}
+        assert replay_download_log(data, "does_not_exist.log.jsonl") == 0
 
 
 class TestTranscriptDownload:
     """Tests for transcript download functionality."""
 
-    def test_download_transcript_creates_file(self):
-        """Test that download_transcript creates a file."""
+    @patch('main._get_api')
+    def test_download_transcript_creates_file(self, mock_get_api):
+        """Test that an unavailable video is reported as a failure without writing a file."""
+        mock_get_api.return_value.fetch.side_effect = VideoUnavailable("invalid_video_id")
+
         with tempfile.TemporaryDirectory() as temp_dir:
             output_file = os.path.join(temp_dir, "test_transcript.txt")
-
-            # This will likely fail for most test video IDs, but we can test the error handling
             success, error, caption_enabled = download_transcript("invalid_video_id", output_file)
 
             # We expect this to fail with an invalid video ID
             assert success == False
             assert error is not None
-            # caption_enabled can be bool or None (None for unknown status)
-            assert caption_enabled is None or isinstance(caption_enabled, bool)
+            # Caption status is unknown when the video itself can't be fetched
+            assert caption_enabled is None
+            assert not os.path.exists(output_file)
 
-    def test_download_transcript_invalid_video_id(self):
+    @patch('main._get_api')
+    def test_download_transcript_invalid_video_id(self, mock_get_api):
         """Test error handling with invalid video ID."""
+        mock_get_api.return_value.fetch.side_effect = InvalidVideoId("")
+
         with tempfile.TemporaryDirectory() as temp_dir:
             output_file = os.path.join(temp_dir, "test_transcript.txt")
             success, error, caption_enabled = download_transcript("", output_file)
@@ -297,8 +410,227 @@ class TestTranscriptDownload:
             assert success == False
             assert error is not None
             assert isinstance(error, str)
-            # caption_enabled can be bool or None (None for unknown status)
-            assert caption_enabled is None or isinstance(caption_enabled, bool)
+            assert caption_enabled is None
+
+    @patch('main._get_api')
+    def test_download_transcript_captions_disabled(self, mock_get_api):
+        """Test that disabled subtitles mark the video as having no captions."""
+        mock_get_api.return_value.fetch.side_effect = TranscriptsDisabled("abc123")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = os.path.join(temp_dir, "test_transcript.txt")
+            success, error, caption_enabled = download_transcript("abc123", output_file)
+
+            assert success == False
+            assert caption_enabled == False
+
+    @patch('main._get_api')
+    def test_download_transcript_writes_timestamped_lines(self, mock_get_api):
+        """Test that fetched snippets are written as '[start - end] text' lines."""
+        mock_get_api.return_value.fetch.return_value = [
+            Mock(text="Hello", start=0.0, duration=1.5),
+            Mock(text="你好世界", start=1.5, duration=2.25),
+        ]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = os.path.join(temp_dir, "test_transcript.txt")
+            success, error, caption_enabled = download_transcript("abc123", output_file)
+
+            assert success == True
+            assert error is None
+            assert caption_enabled == True
+            with open(output_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            assert content == "[0.00s - 1.50s] Hello\n[1.50s - 3.75s] 你好世界\n"
+
+    @patch('main._get_api')
+    def test_download_transcript_native_lang_prefix_match(self, mock_get_api):
+        """Test that 'zh' selects a 'zh-Hans' transcript from the listed transcripts."""
+        transcript_list = MagicMock()
+        transcript_list.find_transcript.side_effect = Exception("No transcript for zh")
+        zh_hans = Mock(language_code="zh-Hans")
+        zh_hans.fetch.return_value = [Mock(text="你好", start=0.0, duration=1.0)]
+        transcript_list.__iter__.return_value = [Mock(language_code="en"), zh_hans]
+        mock_get_api.return_value.list.return_value = transcript_list
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = os.path.join(temp_dir, "test_transcript.txt")
+            success, error, caption_enabled = download_transcript("abc123", output_file, "zh")
+
+            assert success == True
+            zh_hans.fetch.assert_called_once_with()
+
+    @patch('main._get_api')
+    def test_download_transcript_native_lang_fallback_reuses_list(self, mock_get_api):
+        """Test that falling back to the default language does not list transcripts again."""
+        transcript_list = MagicMock()
+        en = Mock()
+        en.fetch.return_value = [Mock(text="Hello", start=0.0, duration=1.0)]
+        transcript_list.find_transcript.side_effect = [Exception("No transcript for ja"), en]
+        transcript_list.__iter__.return_value = []
+        mock_get_api.return_value.list.return_value = transcript_list
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = os.path.join(temp_dir, "test_transcript.txt")
+            success, error, caption_enabled = download_transcript("abc123", output_file, "ja")
+
+            assert success == True
+            mock_get_api.return_value.list.assert_called_once_with("abc123")
+            mock_get_api.return_value.fetch.assert_not_called()
+            transcript_list.find_transcript.assert_called_with(['en'])
+
+    @patch('main._get_api')
+    def test_download_transcript_write_failure(self, mock_get_api):
+        """Test that a local write error is reported while captions are still marked enabled."""
+        mock_get_api.return_value.fetch.return_value = [Mock(text="Hello", start=0.0, duration=1.0)]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = os.path.join(temp_dir, "missing_dir", "test_transcript.txt")
+            success, error, caption_enabled = download_transcript("abc123", output_file)
+
+            assert success == False
+            assert "Failed to write file" in error
+            assert caption_enabled == True
+
+
+class TestApiInstance:
+    """Tests for reuse of the YouTubeTranscriptApi instance."""
+
+    def test_get_api_reused_within_thread(self):
+        """Test that repeated calls on one thread return the same instance."""
+        assert _get_api() is _get_api()
+
+    def test_get_api_session_retries_transient_errors(self):
+        """Test that the API's HTTP session retries transient server errors."""
+        session = _new_http_session()
+        retries = session.get_adapter("https://www.youtube.com").max_retries
+        assert retries.total == 3
+        assert 503 in retries.status_forcelist
+
+    def test_get_api_separate_per_thread(self):
+        """Test that worker threads get their own instance (the API is not thread-safe)."""
+        with ThreadPoolExecutor(max_workers=1) as ex:
+            other = ex.submit(_get_api).result()
+        assert other is not _get_api()
+
+
+class TestProcessVideo:
+    """Tests for the per-video worker used by the batch downloader."""
+
+    @patch('main.download_transcript')
+    def test_process_video_returns_result(self, mock_download):
+        """Test that the worker downloads to the generated filename and returns its result."""
+        mock_download.return_value = (True, None, True)
+        video = {
+            "video_id": "abc123",
+            "video_title": "My Cool Video",
+            "published_time": "01-08-2026",
+        }
+
+        result = process_video(video, "en", os.path.join("out", ""))
+
+        assert result == (video, "01082026_abc123_My-Cool-Video.txt", True, None, True)
+        mock_download.assert_called_once_with(
+            "abc123", os.path.join("out", "01082026_abc123_My-Cool-Video.txt"), "en"
+        )
+
+    @patch('main.download_transcript')
+    def test_process_video_uses_given_filename(self, mock_download):
+        """Test that a filename precomputed by the caller is used as-is."""
+        mock_download.return_value = (True, None, True)
+        video = {
+            "video_id": "abc123",
+            "video_title": "My Cool Video",
+            "published_time": "01-08-2026",
+        }
+
+        _, filename, _, _, _ = process_video(video, None, os.path.join("out", ""), "precomputed.txt")
+
+        assert filename == "precomputed.txt"
+        mock_download.assert_called_once_with("abc123", os.path.join("out", "precomputed.txt"), None)
+
+    @patch('main.download_transcript')
+    def test_process_video_does_not_mutate_video(self, mock_download):
+        """Test that the worker leaves status updates to the caller."""
+        mock_download.return_value = (False, "Subtitles are disabled", False)
+        video = {
+            "video_id": "abc123",
+            "video_title": "My Cool Video",
+            "published_time": "01-08-2026",
+        }
+
+        _, _, success, error, caption_enabled = process_video(video, None, os.path.join("out", ""))
+
+        assert success == False
+        assert error == "Subtitles are disabled"
+        assert caption_enabled == False
+        assert "downloaded_via_native_api" not in video
+
+
+class TestShareResult:
+    """Tests for reusing one download across entries with the same video ID."""
+
+    def test_share_result_copies_to_own_filename(self):
+        """Test that a duplicate entry with a different title gets its own copy."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, "01082026_abc123_First.txt"), 'w', encoding='utf-8') as f:
+                f.write("transcript")
+            first = {"video_id": "abc123", "video_title": "First", "published_time": "01-08-2026"}
+            second = {"video_id": "abc123", "video_title": "Second", "published_time": "01-08-2026"}
+            result = (first, "01082026_abc123_First.txt", True, None, True)
+
+            shared = share_result(result, second, os.path.join(temp_dir, ""))
+
+            assert shared == (second, "01082026_abc123_Second.txt", True, None, True)
+            with open(os.path.join(temp_dir, "01082026_abc123_Second.txt"), 'r', encoding='utf-8') as f:
+                assert f.read() == "transcript"
+
+    def test_share_result_propagates_failure(self):
+        """Test that a failed download is reported for the duplicate without copying."""
+        first = {"video_id": "abc123", "video_title": "First", "published_time": "01-08-2026"}
+        second = {"video_id": "abc123", "video_title": "Second", "published_time": "01-08-2026"}
+        result = (first, "01082026_abc123_First.txt", False, "Subtitles are disabled", False)
+
+        shared = share_result(result, second, os.path.join("does_not_exist", ""))
+
+        assert shared == (second, "01082026_abc123_Second.txt", False, "Subtitles are disabled", False)
+
+
+class TestFetchVideoMetadata:
+    """Tests for single-video metadata lookup."""
+
+    @patch('main.requests.Session')
+    def test_fetch_video_metadata_uses_one_session(self, mock_session_cls):
+        """Test that the oEmbed and watch-page requests share one plain session."""
+        session = mock_session_cls.return_value.__enter__.return_value
+        oembed = Mock(status_code=200)
+        oembed.json.return_value = {"title": "Never Gonna Give You Up"}
+        page = Mock(status_code=200, text='"uploadDate":"2009-10-25T00:00:00-07:00"')
+        session.get.side_effect = [oembed, page]
+
+        result = fetch_video_metadata("dQw4w9WgXcQ")
+
+        assert result == {"title": "Never Gonna Give You Up", "upload_date": "10-25-2009"}
+        mock_session_cls.assert_called_once_with()
+        assert session.get.call_count == 2
+        mock_session_cls.return_value.__exit__.assert_called_once()
+
+
+class TestPositiveInt:
+    """Tests for the --workers argument type."""
+
+    def test_positive_int_valid(self):
+        assert positive_int("16") == 16
+
+    def test_positive_int_rejects_zero_and_negative(self):
+        with pytest.raises(argparse.ArgumentTypeError):
+            positive_int("0")
+        with pytest.raises(argparse.ArgumentTypeError):
+            positive_int("-3")
+
+    def test_positive_int_rejects_non_integer(self):
+        with pytest.raises(argparse.ArgumentTypeError):
+            positive_int("many")
 
 
 class TestIntegration:
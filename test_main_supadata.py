@@ -1,89 +1,130 @@
 import json
+import logging
 import os
-import tempfile
 import pytest
+import requests
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, patch, MagicMock
+import main_supadata
 from main_supadata import (
     format_date,
     sanitize_creator_name,
     generate_filename,
     download_transcript_via_supadata,
     load_content_resources,
-    save_content_resources
+    save_content_resources,
+    process_video,
+    transcript_video_ids,
+    queued_logging,
+    PersistenceManager,
+    _get_session
 )
 
 
+def _mock_resp(status, *, text=None, json_data=None, chunks=None):
+    """Build a mocked Supadata HTTP response.
+
+    ``chunks`` makes a streamed plain-text body; ``json_data`` a JSON body
+    (``text`` defaults to its compact serialization).
+    """
+    response = Mock(status_code=status)
+    if chunks is not None:
+        response.headers = {"Content-Type": "text/plain; charset=utf-8"}
+        response.iter_content.return_value = chunks
+    else:
+        response.headers = {"Content-Type": "application/json; charset=utf-8"}
+    if json_data is not None:
+        response.json.return_value = json_data
+        if text is None:
+            text = json.dumps(json_data, ensure_ascii=False, separators=(",", ":"))
+    if text is not None:
+        response.text = text
+    return response
+
+
+class FakeClock:
+    """Patch main_supadata's time.monotonic/time.sleep so sleeping advances a fake clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def __enter__(self):
+        self._patches = [
+            patch('main_supadata.time.monotonic', side_effect=lambda: self.now),
+            patch('main_supadata.time.sleep', side_effect=self.sleep),
+        ]
+        for p in self._patches:
+            p.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        for p in self._patches:
+            p.stop()
+
+
 class TestSupadataDownload:
     """Tests for Supadata API download functionality."""
 
-    @patch('main_supadata.os.getenv')
-    def test_download_transcript_via_supadata_no_api_key(self, mock_getenv):
+    @pytest.fixture(autouse=True)
+    def _api_key(self, monkeypatch):
+        """Provide a Supadata API key through the environment for every test."""
+        monkeypatch.setenv("SUPADATA_API_KEY", "test_api_key")
+
+    def test_download_transcript_via_supadata_no_api_key(self, monkeypatch, tmp_path):
         """Test that missing API key returns appropriate error."""
-        mock_getenv.return_value = None
+        monkeypatch.delenv("SUPADATA_API_KEY", raising=False)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_file = os.path.join(temp_dir, "test_transcript.txt")
-            success, error = download_transcript_via_supadata("test_video_id", output_file)
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
 
-            assert success == False
-            assert "SUPADATA_API_KEY not found" in error
+        assert success == False
+        assert "SUPADATA_API_KEY not found" in error
 
-    @patch('main_supadata.requests.get')
-    @patch('main_supadata.os.getenv')
-    def test_download_transcript_via_supadata_immediate_success(self, mock_getenv, mock_requests_get):
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_immediate_success(self, mock_requests_get, tmp_path):
         """Test successful immediate response (HTTP 200) from Supadata API."""
-        mock_getenv.return_value = "test_api_key"
-
         # Mock successful immediate response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = "This is a test transcript content."
-        mock_requests_get.return_value = mock_response
+        mock_requests_get.return_value = _mock_resp(200, chunks=[b"This is a test ", b"transcript content."])
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_file = os.path.join(temp_dir, "test_transcript.txt")
-            success, error = download_transcript_via_supadata("test_video_id", output_file)
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
+
+        assert success == True
+        assert error is None
+
+        # Verify file was created with correct content
+        assert os.path.exists(output_file)
+        with open(output_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        assert content == "This is a test transcript content."
+
+        # Verify API was called with correct parameters
+        mock_requests_get.assert_called_once()
+        call_args = mock_requests_get.call_args
+        assert "https://api.supadata.ai/v1/transcript" in call_args[0]
+        assert call_args[1]['params']['url'].startswith('https://www.youtube.com/watch?v=')
+        assert call_args[1]['params']['text'] == "true"
+        assert call_args[1]['headers']['x-api-key'] == "test_api_key"
 
-            assert success == True
-            assert error is None
-
-            # Verify file was created with correct content
-            assert os.path.exists(output_file)
-            with open(output_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            assert content == "This is a test transcript content."
-
-            # Verify API was called with correct parameters
-            mock_requests_get.assert_called_once()
-            call_args = mock_requests_get.call_args
-            assert "https://api.supadata.ai/v1/transcript" in call_args[0]
-            assert call_args[1]['params']['url'].startswith('https://www.youtube.com/watch?v=')
-            assert call_args[1]['params']['text'] == "true"
-            assert call_args[1]['headers']['x-api-key'] == "test_api_key"
-
-    @patch('main_supadata.requests.get')
-    @patch('main_supadata.os.getenv')
+    @patch('main_supadata.requests.Session.get')
     @patch('main_supadata.time.sleep')  # Mock sleep to speed up tests
-    def test_download_transcript_via_supadata_job_completion(self, mock_sleep, mock_getenv, mock_requests_get):
+    def test_download_transcript_via_supadata_job_completion(self, mock_sleep, mock_requests_get, tmp_path):
         """Test successful job completion (HTTP 202 -> job polling -> completion)."""
-        mock_getenv.return_value = "test_api_key"
-
         # Mock initial 202 response with job ID
-        mock_initial_response = Mock()
-        mock_initial_response.status_code = 202
-        mock_initial_response.json.return_value = {"jobId": "test_job_123"}
+        mock_initial_response = _mock_resp(202, json_data={"jobId": "test_job_123"})
 
         # Mock job status check responses
-        mock_active_response = Mock()
-        mock_active_response.status_code = 200
-        mock_active_response.json.return_value = {"status": "active"}
+        mock_active_response = _mock_resp(200, json_data={"status": "active"})
 
-        mock_completed_response = Mock()
-        mock_completed_response.status_code = 200
-        mock_completed_response.json.return_value = {
+        mock_completed_response = _mock_resp(200, json_data={
             "status": "completed",
             "content": "Final transcript content from job."
-        }
+        })
 
         # Set up the mock to return different responses on successive calls
         mock_requests_get.side_effect = [
@@ -92,278 +133,616 @@ class TestSupadataDownload:
             mock_completed_response  # Second status check
         ]
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_file = os.path.join(temp_dir, "test_transcript.txt")
-            success, error = download_transcript_via_supadata("test_video_id", output_file)
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
 
-            assert success == True
-            assert error is None
+        assert success == True
+        assert error is None
 
-            # Verify file was created with correct content
-            assert os.path.exists(output_file)
-            with open(output_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            assert content == "Final transcript content from job."
+        # Verify file was created with correct content
+        assert os.path.exists(output_file)
+        with open(output_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        assert content == "Final transcript content from job."
 
-            # Verify multiple API calls were made
-            assert mock_requests_get.call_count == 3
+        # Verify multiple API calls were made
+        assert mock_requests_get.call_count == 3
 
-    @patch('main_supadata.requests.get')
-    @patch('main_supadata.os.getenv')
+    @patch('main_supadata.requests.Session.get')
     @patch('main_supadata.time.sleep')
-    def test_download_transcript_via_supadata_job_with_list_content(self, mock_sleep, mock_getenv, mock_requests_get):
+    def test_download_transcript_via_supadata_job_with_list_content(self, mock_sleep, mock_requests_get, tmp_path):
         """Test job completion with structured list content instead of plain text."""
-        mock_getenv.return_value = "test_api_key"
-
         # Mock initial 202 response
-        mock_initial_response = Mock()
-        mock_initial_response.status_code = 202
-        mock_initial_response.json.return_value = {"jobId": "test_job_456"}
+        mock_initial_response = _mock_resp(202, json_data={"jobId": "test_job_456"})
 
         # Mock completed response with list content
-        mock_completed_response = Mock()
-        mock_completed_response.status_code = 200
-        mock_completed_response.json.return_value = {
+        mock_completed_response = _mock_resp(200, json_data={
             "status": "completed",
             "content": [
                 {"text": "First segment of transcript."},
                 {"text": "Second segment of transcript."},
                 {"text": "Third segment of transcript."}
             ]
-        }
+        })
 
         mock_requests_get.side_effect = [
             mock_initial_response,
             mock_completed_response
         ]
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_file = os.path.join(temp_dir, "test_transcript.txt")
-            success, error = download_transcript_via_supadata("test_video_id", output_file)
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
 
-            assert success == True
-            assert error is None
+        assert success == True
+        assert error is None
 
-            # Verify file content
-            with open(output_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            assert "First segment of transcript." in content
-            assert "Second segment of transcript." in content
-            assert "Third segment of transcript." in content
+        # Verify file content
+        with open(output_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        for segment in ("First segment of transcript.", "Second segment of transcript.", "Third segment of transcript."):
+            assert segment in content
 
-    @patch('main_supadata.requests.get')
-    @patch('main_supadata.os.getenv')
+    @patch('main_supadata.requests.Session.get')
     @patch('main_supadata.time.sleep')
-    def test_download_transcript_via_supadata_job_failed(self, mock_sleep, mock_getenv, mock_requests_get):
+    def test_download_transcript_via_supadata_job_failed(self, mock_sleep, mock_requests_get, tmp_path):
         """Test handling of failed job status."""
-        mock_getenv.return_value = "test_api_key"
-
         # Mock initial 202 response
-        mock_initial_response = Mock()
-        mock_initial_response.status_code = 202
-        mock_initial_response.json.return_value = {"jobId": "test_job_789"}
+        mock_initial_response = _mock_resp(202, json_data={"jobId": "test_job_789"})
 
         # Mock failed job response
-        mock_failed_response = Mock()
-        mock_failed_response.status_code = 200
-        mock_failed_response.json.return_value = {"status": "failed"}
+        mock_failed_response = _mock_resp(200, json_data={"status": "failed"})
 
         mock_requests_get.side_effect = [
             mock_initial_response,
             mock_failed_response
         ]
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_file = os.path.join(temp_dir, "test_transcript.txt")
-            success, error = download_transcript_via_supadata("test_video_id", output_file)
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
 
-            assert success == False
-            assert "Supadata job failed" in error
+        assert success == False
+        assert "Supadata job failed" in error
 
-    @patch('main_supadata.requests.get')
-    @patch('main_supadata.os.getenv')
-    def test_download_transcript_via_supadata_api_error(self, mock_getenv, mock_requests_get):
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_api_error(self, mock_requests_get, tmp_path):
         """Test handling of API error responses."""
-        mock_getenv.return_value = "test_api_key"
-
         # Mock error response
-        mock_response = Mock()
-        mock_response.status_code = 429
-        mock_response.text = '{"error":"limit-exceeded"}'
-        mock_requests_get.return_value = mock_response
+        mock_requests_get.return_value = _mock_resp(429, text='{"error":"limit-exceeded"}')
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_file = os.path.join(temp_dir, "test_transcript.txt")
-            success, error = download_transcript_via_supadata("test_video_id", output_file)
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
 
-            assert success == False
-            assert "429" in error
+        assert success == False
+        assert "429" in error
 
-    @patch('main_supadata.requests.get')
-    @patch('main_supadata.os.getenv')
-    def test_download_transcript_via_supadata_network_error(self, mock_getenv, mock_requests_get):
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_network_error(self, mock_requests_get, tmp_path):
         """Test handling of network errors."""
-        mock_getenv.return_value = "test_api_key"
-
         # Mock network error
-        import requests
         mock_requests_get.side_effect = requests.exceptions.ConnectionError("Network error")
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_file = os.path.join(temp_dir, "test_transcript.txt")
-            success, error = download_transcript_via_supadata("test_video_id", output_file)
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
 
-            assert success == False
-            assert "Network error" in error
+        assert success == False
+        assert "Network error" in error
 
-    @patch('main_supadata.requests.get')
-    @patch('main_supadata.os.getenv')
-    def test_download_transcript_via_supadata_with_language(self, mock_getenv, mock_requests_get):
-        """Test that language parameter is passed correctly."""
-        mock_getenv.return_value = "test_api_key"
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_timeout(self, mock_requests_get, tmp_path):
+        """Test that request timeouts are reported separately from other network errors."""
+        mock_requests_get.side_effect = requests.exceptions.ReadTimeout("read timed out")
 
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = "Transcript in specified language."
-        mock_requests_get.return_value = mock_response
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_file = os.path.join(temp_dir, "test_transcript.txt")
-            success, error = download_transcript_via_supadata("test_video_id", output_file, native_lang="zh")
+        assert success == False
+        assert error == "Network error: request timed out"
 
-            assert success == True
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_programming_error_propagates(self, mock_requests_get, tmp_path):
+        """Test that unexpected errors are no longer swallowed as download failures."""
+        mock_requests_get.side_effect = TypeError("bug")
 
-            # Verify language parameter was passed
-            call_args = mock_requests_get.call_args
-            assert call_args[1]['params']['lang'] == "zh"
+        output_file = str(tmp_path / "test_transcript.txt")
+        with pytest.raises(TypeError):
+            download_transcript_via_supadata("test_video_id", output_file)
 
-    @patch('main_supadata.requests.get')
-    @patch('main_supadata.os.getenv')
-    def test_download_transcript_via_supadata_empty_response(self, mock_getenv, mock_requests_get):
-        """Test handling of empty HTTP 200 response."""
-        mock_getenv.return_value = "test_api_key"
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_with_language(self, mock_requests_get, tmp_path):
+        """Test that language parameter is passed correctly."""
+        mock_requests_get.return_value = _mock_resp(200, chunks=[b"Transcript in specified language."])
+
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file, native_lang="zh")
+
+        assert success == True
+
+        # Verify language parameter was passed
+        call_args = mock_requests_get.call_args
+        assert call_args[1]['params']['lang'] == "zh"
 
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_empty_response(self, mock_requests_get, tmp_path):
+        """Test handling of empty HTTP 200 response."""
         # Mock empty response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = ""
-        mock_requests_get.return_value = mock_response
+        mock_requests_get.return_value = _mock_resp(200, chunks=[])
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_file = os.path.join(temp_dir, "test_transcript.txt")
-            success, error = download_transcript_via_supadata("test_video_id", output_file)
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
 
-            assert success == False
-            assert "empty response" in error.lower()
+        assert success == False
+        assert "empty response" in error.lower()
+        assert not os.path.exists(output_file)
 
-    @patch('main_supadata.requests.get')
-    @patch('main_supadata.os.getenv')
-    def test_download_transcript_via_supadata_whitespace_only_response(self, mock_getenv, mock_requests_get):
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_whitespace_only_response(self, mock_requests_get, tmp_path):
         """Test handling of whitespace-only HTTP 200 response."""
-        mock_getenv.return_value = "test_api_key"
-
         # Mock whitespace-only response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = "   \n\t  "
-        mock_requests_get.return_value = mock_response
+        mock_requests_get.return_value = _mock_resp(200, chunks=[b"   \n", b"\t  "])
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_file = os.path.join(temp_dir, "test_transcript.txt")
-            success, error = download_transcript_via_supadata("test_video_id", output_file)
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
 
-            assert success == False
-            assert "empty response" in error.lower()
+        assert success == False
+        assert "empty response" in error.lower()
+        assert not os.path.exists(output_file)
 
-    @patch('main_supadata.requests.get')
-    @patch('main_supadata.os.getenv')
-    def test_download_transcript_via_supadata_json_response_format_chinese(self, mock_getenv, mock_requests_get):
-        """Test handling of JSON response format from Supadata API for Chinese content."""
-        mock_getenv.return_value = "test_api_key"
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_streamed_text_is_stripped(self, mock_requests_get, tmp_path):
+        """Test that a streamed plain-text transcript is saved without surrounding whitespace."""
+        mock_requests_get.return_value = _mock_resp(
+            200, chunks=[b"\n  ", b"  First line\n", b"\n", b"Second line", b"  \n", b"\n"]
+        )
+
+        output_file = tmp_path / "test_transcript.txt"
+        success, error = download_transcript_via_supadata("test_video_id", str(output_file))
+
+        assert success == True
+        assert output_file.read_bytes() == b"First line\n\nSecond line"
+
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_stream_network_error(self, mock_requests_get, tmp_path):
+        """Test that a connection error mid-stream is a network error and leaves no partial file."""
+        def broken_stream():
+            yield b"partial"
+            raise requests.exceptions.ChunkedEncodingError("boom")
+
+        mock_requests_get.return_value = response = _mock_resp(200, chunks=broken_stream())
+
+        success, error = download_transcript_via_supadata("test_video_id", str(tmp_path / "test_transcript.txt"))
+
+        assert success == False
+        assert error == "Network error: boom"
+        assert list(tmp_path.iterdir()) == []
+        response.close.assert_called_once()
+
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_stream_write_error(self, mock_requests_get, tmp_path):
+        """Test that a file that can't be opened is reported and the response is still closed."""
+        mock_requests_get.return_value = response = _mock_resp(200, chunks=[b"Some text"])
+
+        output_file = str(tmp_path / "missing_dir" / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
+
+        assert success == False
+        assert "Failed to write file" in error
+        response.close.assert_called_once()
+
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_immediate_structured_content(self, mock_requests_get, tmp_path):
+        """Test that an immediate JSON response with timestamped entries is written one line per entry."""
+        mock_requests_get.return_value = _mock_resp(200, json_data={
+            "lang": "zh",
+            "content": [{"text": "你 好", "offset": 0}, {"text": "世界", "offset": 1000}]
+        })
+
+        output_file = tmp_path / "test_transcript.txt"
+        success, error = download_transcript_via_supadata("test_video_id", str(output_file))
+
+        assert success == True
+        assert error is None
+        assert output_file.read_text(encoding='utf-8') == "你 好\n世界\n"
+
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_json_served_as_text(self, mock_requests_get, tmp_path):
+        """Test that a JSON body with a text Content-Type still has its content extracted."""
+        mock_requests_get.return_value = _mock_resp(
+            200, chunks=[b'\n {"lang": "zh", ', b'"content": "\\u4f60 \\u597d"}']
+        )
+
+        output_file = tmp_path / "test_transcript.txt"
+        success, error = download_transcript_via_supadata("test_video_id", str(output_file))
+
+        assert success == True
+        assert output_file.read_text(encoding='utf-8') == "你好"
+
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_json_whitespace_only_content(self, mock_requests_get, tmp_path):
+        """Test that JSON content made only of whitespace is treated as empty."""
+        mock_requests_get.return_value = _mock_resp(200, json_data={"lang": "en", "content": " \n\t "})
+
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
 
+        assert success == False
+        assert "empty response" in error.lower()
+        assert not os.path.exists(output_file)
+
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_json_content_is_stripped(self, mock_requests_get, tmp_path):
+        """Test that surrounding whitespace in JSON content is not written to the file."""
+        mock_requests_get.return_value = _mock_resp(200, json_data={"lang": "en", "content": "\n  Hello world  \n"})
+
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
+
+        assert success == True
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert f.read() == "Hello world"
+
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_json_response_format_chinese(self, mock_requests_get, tmp_path):
+        """Test handling of JSON response format from Supadata API for Chinese content."""
         # Mock JSON response (API sometimes returns JSON even with text=true)
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = '{"lang":"zh","availableLangs":["zh"],"content":"那今天这 个视频呢 就跟大家 聊到这个 地方了谢 谢大家收 看我们下 期再见拜拜"}'
-        mock_response.json.return_value = {
+        mock_requests_get.return_value = _mock_resp(200, json_data={
             "lang": "zh",
             "availableLangs": ["zh"],
             "content": "那今天这 个视频呢 就跟大家 聊到这个 地方了谢 谢大家收 看我们下 期再见拜拜"
-        }
-        mock_requests_get.return_value = mock_response
+        })
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_file = os.path.join(temp_dir, "test_transcript.txt")
-            success, error = download_transcript_via_supadata("test_video_id", output_file)
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
 
-            assert success == True
-            assert error is None
+        assert success == True
+        assert error is None
 
-            # Verify file content has spaces stripped for Chinese
-            with open(output_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            # Spaces should be removed for Chinese
-            assert " " not in content
-            assert "那今天这个视频呢就跟大家聊到这个地方了谢谢大家收看我们下期再见拜拜" in content
+        # Verify file content has spaces stripped for Chinese
+        with open(output_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        # Spaces should be removed for Chinese
+        assert " " not in content
+        assert "那今天这个视频呢就跟大家聊到这个地方了谢谢大家收看我们下期再见拜拜" in content
 
-    @patch('main_supadata.requests.get')
-    @patch('main_supadata.os.getenv')
-    def test_download_transcript_via_supadata_json_response_format_english(self, mock_getenv, mock_requests_get):
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_json_response_format_english(self, mock_requests_get, tmp_path):
         """Test handling of JSON response format from Supadata API for English content."""
-        mock_getenv.return_value = "test_api_key"
-
         # Mock JSON response for English content
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = '{"lang":"en","availableLangs":["en"],"content":"Hello world how are you today"}'
-        mock_response.json.return_value = {
+        mock_requests_get.return_value = _mock_resp(200, json_data={
             "lang": "en",
             "availableLangs": ["en"],
             "content": "Hello world how are you today"
-        }
-        mock_requests_get.return_value = mock_response
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_file = os.path.join(temp_dir, "test_transcript.txt")
-            success, error = download_transcript_via_supadata("test_video_id", output_file)
+        })
 
-            assert success == True
-            assert error is None
+        output_file = str(tmp_path / "test_transcript.txt")
+        success, error = download_transcript_via_supadata("test_video_id", output_file)
 
-            # Verify file content PRESERVES spaces for English
-            with open(output_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            # Spaces should be preserved for English
-            assert content == "Hello world how are you today"
-            assert " " in content  # Spaces must be present
+        assert success == True
+        assert error is None
 
-    @patch('main_supadata.requests.get')
-    @patch('main_supadata.os.getenv')
-    @patch('main_supadata.time.sleep')
-    def test_download_transcript_via_supadata_job_timeout(self, mock_sleep, mock_getenv, mock_requests_get):
-        """Test that job polling times out after max attempts."""
-        mock_getenv.return_value = "test_api_key"
+        # Verify file content PRESERVES spaces for English
+        with open(output_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        # Spaces should be preserved for English
+        assert content == "Hello world how are you today"
+        assert " " in content  # Spaces must be present
 
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_job_timeout(self, mock_requests_get, tmp_path):
+        """Test that job polling times out once the deadline passes."""
         # Mock initial 202 response
-        mock_initial_response = Mock()
-        mock_initial_response.status_code = 202
-        mock_initial_response.json.return_value = {"jobId": "test_job_timeout"}
+        mock_initial_response = _mock_resp(202, json_data={"jobId": "test_job_timeout"})
 
         # Mock active response that never completes
-        mock_active_response = Mock()
-        mock_active_response.status_code = 200
-        mock_active_response.json.return_value = {"status": "active"}
+        mock_active_response = _mock_resp(200, json_data={"status": "active"})
 
         # Return active status for all polling attempts
         mock_requests_get.side_effect = [mock_initial_response] + [mock_active_response] * 30
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_file = os.path.join(temp_dir, "test_transcript.txt")
+        with FakeClock():
+            output_file = str(tmp_path / "test_transcript.txt")
             success, error = download_transcript_via_supadata("test_video_id", output_file)
 
             assert success == False
             assert "Job timed out" in error
 
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_polling_backs_off(self, mock_requests_get, tmp_path):
+        """Test that poll waits start short, grow, stay capped, and cover the full timeout."""
+        mock_initial_response = _mock_resp(202, json_data={"jobId": "test_job_backoff"})
+
+        mock_active_response = _mock_resp(200, json_data={"status": "active"})
+
+        mock_requests_get.side_effect = [mock_initial_response] + [mock_active_response] * 30
+
+        with FakeClock() as clock:
+            output_file = str(tmp_path / "test_transcript.txt")
+            success, error = download_transcript_via_supadata("test_video_id", output_file)
+
+        delays = clock.sleeps
+        assert success == False
+        assert delays[0] == main_supadata.SUPADATA_POLL_INITIAL
+        assert delays[1] > delays[0]
+        assert max(delays) <= main_supadata.SUPADATA_POLL_MAX + 0.2
+        assert sum(delays) == pytest.approx(main_supadata.SUPADATA_JOB_TIMEOUT)
+        assert len(delays) < 30
+
+    @patch('main_supadata.requests.Session.get')
+    def test_download_transcript_via_supadata_slow_polls_count_toward_deadline(self, mock_requests_get, tmp_path):
+        """Test that time spent in status requests uses up the polling budget."""
+        mock_initial_response = _mock_resp(202, json_data={"jobId": "test_job_slow"})
+
+        mock_active_response = _mock_resp(200, json_data={"status": "active"})
+
+        with FakeClock() as clock:
+            def fake_get(url, *args, **kwargs):
+                if url.endswith("/transcript"):
+                    return mock_initial_response
+                clock.now += 20  # every status request takes 20 seconds
+                return mock_active_response
+
+            mock_requests_get.side_effect = fake_get
+
+            output_file = str(tmp_path / "test_transcript.txt")
+            success, error = download_transcript_via_supadata("test_video_id", output_file)
+
+        assert success == False
+        assert "Job timed out" in error
+        assert len(clock.sleeps) == 5
+
+
+class TestSupadataProcessVideo:
+    """Tests for the per-video worker used by the Supadata batch downloader."""
+
+    @patch('main_supadata.download_transcript_via_supadata')
+    def test_process_video_returns_result(self, mock_download):
+        """Test that the worker downloads to the generated filename and leaves the video untouched."""
+        mock_download.return_value = (True, None)
+        video = {
+            "video_id": "abc123",
+            "video_title": "My Cool Video",
+            "published_time": "01-08-2026",
+            "caption_enabled": False,
+        }
+
+        result = process_video(video, "zh", os.path.join("out", ""))
+
+        assert result == (video, "01082026_abc123_My-Cool-Video.txt", True, None)
+        mock_download.assert_called_once_with(
+            "abc123", os.path.join("out", "01082026_abc123_My-Cool-Video.txt"), "zh"
+        )
+        assert "downloaded_via_supadata" not in video
+
+
+class TestTranscriptVideoIds:
+    """Tests for extracting video IDs from existing transcript filenames."""
+
+    def test_transcript_video_ids(self):
+        """Test that IDs are read from titled and untitled transcript names."""
+        names = {
+            "01082026_dQw4w9WgXcQ_Never-Gonna.txt",
+            "01082026_a_b-cdefghi.txt",
+            "01082026_abc123_Short-ID.txt",
+            "notes.txt",
+        }
+        assert transcript_video_ids(names) == {"dQw4w9WgXcQ", "a_b-cdefghi"}
+
+
+class TestSupadataWriteBytes:
+    """Tests for the low-level transcript writer in main_supadata.py."""
+
+    def test_write_bytes_replaces_existing_file(self, tmp_path):
+        """Test that _write_bytes truncates and overwrites an existing file."""
+        output_file = str(tmp_path / "test_transcript.txt")
+        main_supadata._write_bytes(output_file, "a much longer first transcript".encode('utf-8'))
+        main_supadata._write_bytes(output_file, "字幕\n".encode('utf-8'))
+
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert f.read() == "字幕\n"
+
+    def test_write_transcript_joins_list_entries(self, tmp_path):
+        """Test that structured entries become one line each, skipping non-object entries."""
+        output_file = str(tmp_path / "test_transcript.txt")
+        content = [{"text": "First"}, "stray", {"offset": 5}, {"text": "Third"}]
+        assert main_supadata._write_transcript(output_file, content) is None
+
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert f.read() == "First\n\nThird\n"
+
+    def test_write_transcript_rejects_list_without_entries(self, tmp_path):
+        """Test that a list with no object entries is an error, not an empty transcript."""
+        output_file = str(tmp_path / "test_transcript.txt")
+        error = main_supadata._write_transcript(output_file, ["x", "y"])
+
+        assert error == "No text entries in transcript content"
+        assert not os.path.exists(output_file)
+
+    def test_write_transcript_rejects_unexpected_content(self, tmp_path):
+        """Test that _write_transcript reports unsupported content without creating a file."""
+        output_file = str(tmp_path / "test_transcript.txt")
+        error = main_supadata._write_transcript(output_file, {"text": "hi"})
+
+        assert "Unexpected content type" in error
+        assert not os.path.exists(output_file)
+
+
+class TestSupadataJSONOperations:
+    """Tests for saving content resources from main_supadata.py."""
+
+    def test_load_content_resources(self, sample_content_resources_file, sample_content_resources):
+        """Test loading content resources from JSON file."""
+        assert load_content_resources(sample_content_resources_file) == sample_content_resources
+
+    def test_save_content_resources_matches_with_and_without_orjson(self, tmp_path):
+        """Test that both JSON backends write identical, readable output."""
+        test_data = {
+            "content_resources": [
+                {"content_creator": "海伦子Hellen", "content_collection": [{"video_id": "abc123"}]}
+            ]
+        }
+
+        fast_path = str(tmp_path / "fast.json")
+        stdlib_path = str(tmp_path / "stdlib.json")
+        save_content_resources(test_data, fast_path)
+        with patch('main_supadata.orjson', None):
+            save_content_resources(test_data, stdlib_path)
+
+        with open(fast_path, 'rb') as f:
+            fast = f.read()
+        with open(stdlib_path, 'rb') as f:
+            stdlib = f.read()
+        assert fast == stdlib
+        assert "海伦子Hellen" in stdlib.decode('utf-8')
+        assert load_content_resources(stdlib_path) == test_data
+        with patch('main_supadata.orjson', None):
+            assert load_content_resources(fast_path) == test_data
+
+    def test_save_content_resources_skips_unchanged_data(self, tmp_path):
+        """Test that saving identical data again does not rewrite the file."""
+        test_data = {"content_resources": [{"content_creator": "Test", "content_collection": []}]}
+
+        file_path = str(tmp_path / "content_resources.json")
+        save_content_resources(test_data, file_path)
+
+        with patch('main_supadata.os.replace') as mock_replace:
+            save_content_resources(test_data, file_path)
+            mock_replace.assert_not_called()
+
+            test_data["content_resources"][0]["content_creator"] = "Changed"
+            save_content_resources(test_data, file_path)
+            mock_replace.assert_called_once()
+
+    def test_save_content_resources_rewrites_missing_file(self, tmp_path):
+        """Test that unchanged data is written again if the file was removed."""
+        test_data = {"content_resources": []}
+
+        file_path = str(tmp_path / "content_resources.json")
+        save_content_resources(test_data, file_path)
+        os.remove(file_path)
+        save_content_resources(test_data, file_path)
+
+        assert load_content_resources(file_path) == test_data
+
+
+class TestPersistenceManager:
+    """Tests for batched saving of content_resources.json."""
+
+    def test_flush_writes_only_when_dirty(self, tmp_path):
+        """Test that flush() saves pending changes once and is a no-op afterwards."""
+        data = {"content_resources": []}
+        file_path = str(tmp_path / "content_resources.json")
+        persistence = PersistenceManager(data, file_path, interval=60)
+
+        assert persistence.flush() == True
+        assert not os.path.exists(file_path)
+
+        persistence.mark_dirty()
+        assert persistence.flush() == True
+        assert load_content_resources(file_path) == data
+        assert not os.path.exists(file_path + ".tmp")
+
+    def test_mark_dirty_saves_in_background(self, tmp_path):
+        """Test that the background timer saves marked changes without an explicit flush."""
+        data = {"content_resources": []}
+        file_path = str(tmp_path / "content_resources.json")
+        persistence = PersistenceManager(data, file_path, interval=0.05)
+
+        with patch('main_supadata.save_content_resources') as mock_save:
+            persistence.mark_dirty()
+            timer = persistence._timer
+            persistence.mark_dirty()
+            timer.join(timeout=5)
+
+        mock_save.assert_called_once_with(data, file_path)
+
+    def test_flush_keeps_data_dirty_on_failure(self):
+        """Test that a failed save is retried by the next flush."""
+        data = {"content_resources": []}
+        persistence = PersistenceManager(data, "unused.json", interval=60)
+        persistence.mark_dirty()
+
+        with patch('main_supadata.save_content_resources', side_effect=OSError("disk full")):
+            assert persistence.flush() == False
+        with patch('main_supadata.save_content_resources') as mock_save:
+            assert persistence.flush() == True
+        mock_save.assert_called_once()
+
+
+class TestSupadataSession:
+    """Tests for the per-thread Supadata HTTP sessions."""
+
+    def test_session_retries_rate_limits_and_server_errors(self):
+        retries = _get_session().get_adapter("https://api.supadata.ai").max_retries
+        assert retries.total == 3
+        assert 429 in retries.status_forcelist
+        assert 503 in retries.status_forcelist
+        # An exhausted retry returns the last response so its status is reported
+        assert retries.raise_on_status == False
+
+    def test_session_reused_within_thread(self):
+        """Test that repeated calls on one thread return the same session."""
+        assert _get_session() is _get_session()
+
+    def test_session_separate_per_thread_with_shared_pool(self):
+        """Test that worker threads get their own session on the shared connection pool."""
+        with ThreadPoolExecutor(max_workers=1) as ex:
+            other = ex.submit(_get_session).result()
+        assert other is not _get_session()
+        assert other.get_adapter("https://api.supadata.ai") is _get_session().get_adapter("https://api.supadata.ai")
+
+    def test_main_sizes_worker_pool_per_run(self, tmp_path, monkeypatch):
+        """Test that main() gives its workers a pool sized for the run without touching the default."""
+        monkeypatch.chdir(tmp_path)
+        default_adapter = main_supadata._ADAPTER
+        data = {"content_resources": [{"content_creator": "Test Creator", "content_collection": [
+            {"video_id": "abc123", "video_title": "Test", "published_time": "01-02-2025", "caption_enabled": False}
+        ]}]}
+        worker_adapters = []
+
+        def fake_process_video(video, native_lang, output_prefix, filename):
+            worker_adapters.append(_get_session().get_adapter("https://api.supadata.ai"))
+            return video, filename, False, "failed"
+
+        with patch('main_supadata.load_content_resources', return_value=data), \
+             patch('main_supadata.save_content_resources'), \
+             patch('main_supadata.process_video', fake_process_video):
+            main_supadata.main(max_workers=64)
+
+        assert worker_adapters[0] is not default_adapter
+        assert worker_adapters[0]._pool_maxsize == 64
+        assert main_supadata._ADAPTER is default_adapter
+
+
+class TestQueuedLogging:
+    """Tests for queued status logging in main_supadata.py."""
+
+    def test_queued_logging_writes_messages_to_stdout(self, capsys):
+        """Test that records logged from worker threads reach stdout in full."""
+        def log_lines(worker):
+            for i in range(20):
+                main_supadata.logger.info(f"✓ worker {worker} line {i}")
+
+        with queued_logging():
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(log_lines, range(4)))
+
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 80
+        assert "✓ worker 3 line 19" in lines
+        assert main_supadata.logger.handlers == []
+        assert main_supadata.logger.level == logging.NOTSET
+
+    def test_main_prints_status_without_caller_setup(self, tmp_path, monkeypatch, capsys):
+        """Test that main() sets up its own output when called from Python."""
+        monkeypatch.chdir(tmp_path)
+        data = {"content_resources": [{"content_creator": "Test Creator", "content_collection": []}]}
+        with patch('main_supadata.load_content_resources', return_value=data):
+            main_supadata.main()
+
+        out = capsys.readouterr().out
+        assert "Skipping 'Test Creator' - no videos in collection" in out
+        assert "SUMMARY (Supadata API)" in out
+        assert main_supadata.logger.handlers == []
+
 
 class TestSupadataHelperFunctions:
     """Tests for helper functions used in main_supadata.py."""
@@ -372,10 +751,47 @@ class TestSupadataHelperFunctions:
         """Test date formatting function."""
         assert format_date("01-15-2026") == "01152026"
 
+    def test_format_date_repeated_calls_hit_cache(self):
+        """Test that repeated publish dates are served from the memo cache."""
+        format_date.cache_clear()
+        for _ in range(3):
+            assert format_date("03-15-2025") == "03152025"
+        info = format_date.cache_info()
+        assert (info.hits, info.misses) == (2, 1)
+
+    def test_format_date_accepts_unpadded_month_and_day(self):
+        """Test that dates without zero padding are still normalized."""
+        assert format_date("1-5-2026") == "01052026"
+
+    def test_format_date_rejects_invalid_dates(self):
+        """Test that malformed and impossible dates are rejected."""
+        for bad in ("2026-01-15", "13-01-2025", "02-30-2025", "0a-15-2026", "01-15-2026-01"):
+            with pytest.raises(ValueError, match="Invalid date format"):
+                format_date(bad)
+
     def test_sanitize_creator_name(self):
         """Test creator name sanitization."""
         assert sanitize_creator_name("Test Creator") == "Test_Creator"
 
+    def test_sanitize_creator_name_removes_invalid_characters(self):
+        """Test that invalid filename and control characters are removed."""
+        assert sanitize_creator_name('Creator<>:"/\\|?*Name') == "CreatorName"
+        assert sanitize_creator_name("Creator\x00\x1fName") == "CreatorName"
+        assert sanitize_creator_name(":::") == "Unknown"
+
+    def test_sanitize_creator_name_preserves_chinese(self):
+        """Test that non-ASCII characters pass through unchanged."""
+        assert sanitize_creator_name("Money or Life 美股频道") == "Money_or_Life_美股频道"
+        assert sanitize_creator_name("Creator: 海伦子?") == "Creator_海伦子"
+
+    def test_sanitize_creator_name_clean_and_edge_names(self):
+        """Test that clean names come back as-is and edge characters are still trimmed."""
+        assert sanitize_creator_name("海伦子Hellen") == "海伦子Hellen"
+        assert sanitize_creator_name("_Creator") == "Creator"
+        assert sanitize_creator_name("Creator.") == "Creator"
+        assert sanitize_creator_name("Tab\tName") == "TabName"
+        assert sanitize_creator_name("") == "Unknown"
+
     def test_generate_filename(self):
         """Test filename generation."""
         filename = generate_filename("12-25-2025", "Test Creator", "abc123")